@@ -1,60 +1,151 @@
 import os
-from time import sleep
-from typing import Optional
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
 
-import requests
 from requests.exceptions import HTTPError
 
+from api.http_client import get_session
+from api.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
+from cache.tiered_cache import TieredCache
+from instrumentation.metrics import get_registry, instrumented
+
+AIRVISUAL_API_URL = os.getenv("AIRVISUAL_API_URL", "http://api.airvisual.com/v2/city")
+AIRVISUAL_RATE_LIMIT_PER_MINUTE = float(
+    os.getenv("AIRVISUAL_RATE_LIMIT_PER_MINUTE", "5")
+)
+MAX_RETRIES = 5
+RESPONSE_TTL_HOURS = 1
+# Nível persistente do cache de respostas (vazio desativa; só memória)
+RESPONSE_CACHE_PATH = os.getenv(
+    "AIRVISUAL_CACHE_PATH",
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "..",
+            "data",
+            "cache",
+            "airvisual_responses.db",
+        )
+    ),
+)
+
+rate_limiter = TokenBucket(AIRVISUAL_RATE_LIMIT_PER_MINUTE)
+_response_cache: Optional[TieredCache] = None
+_response_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CityEnvironment:
+    """
+    Dados ambientais de uma cidade extraídos de uma única resposta da AirVisual.
+    """
+
+    aqi: Optional[int]
+    main_pollutant: Optional[str]
+    temperature_c: Optional[float]
+    humidity: Optional[int]
+    wind_speed: Optional[float]
+
 
+@instrumented("airvisual.get_air_quality")
 def get_air_quality(
-    city: str, state: str, country: str, wait: int = 10
+    city: str, state: str, country: str, max_retries: int = MAX_RETRIES
 ) -> Optional[dict]:
     """
     Consulta a qualidade do ar de uma cidade utilizando a API do AirVisual.
 
+    As requisições passam por um limitador de taxa compartilhado entre threads
+    (AIRVISUAL_RATE_LIMIT_PER_MINUTE). Em caso de limite atingido (429), todas
+    as requisições são pausadas com backoff exponencial e jitter, respeitando o
+    cabeçalho Retry-After.
+
     Args:
         city (str): Nome da cidade.
         state (str): Nome do estado ou distrito.
         country (str): Nome do país.
-        wait (int): Tempo de espera em segundos em caso de limite de requisições (padrão: 10).
+        max_retries (int): Número máximo de novas tentativas após um 429 (padrão: 5).
 
     Returns:
         Optional[dict]: Dados da qualidade do ar, ou None em caso de erro ou ausência de dados.
     """
-    try:
-        url = "http://api.airvisual.com/v2/city"
-        params = {
-            "city": city,
-            "state": state,
-            "country": country,
-            "key": os.environ.get("AIRVISUAL_KEY"),
-        }
-        response = requests.get(url=url, params=params, timeout=5)
-        response.raise_for_status()
-        return response.json()
-
-    except HTTPError as e:
-        if e.response.status_code == 429 and wait <= 100:
+    params = {
+        "city": city,
+        "state": state,
+        "country": country,
+        "key": os.environ.get("AIRVISUAL_KEY"),
+    }
+
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire()
+        try:
+            response = get_session().get(AIRVISUAL_API_URL, params=params, timeout=5)
+            response.raise_for_status()
+            return response.json()
+
+        except HTTPError as e:
+            if e.response.status_code == 429 and attempt < max_retries:
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                wait = backoff_delay(attempt, retry_after)
+                get_registry().inc(
+                    "api_throttled_total",
+                    help="Respostas 429 (limite de taxa)",
+                    api="airvisual",
+                )
+                print(
+                    f"[LIMITE ALCANÇADO] Aguardando {wait:.1f} segundos antes de tentar novamente..."
+                )
+                rate_limiter.pause(wait)
+                continue
+            print(f"[ERRO HTTP] Código {e.response.status_code} - {e}")
+
+        except Exception as e:
             print(
-                f"[LIMITE ALCANÇADO] Aguardando {wait} segundos antes de tentar novamente..."
-            )
-            sleep(wait)
-            return get_air_quality(
-                city=city, state=state, country=country, wait=wait + 10
+                f"[ERRO DESCONHECIDO] Não foi possível obter dados de qualidade do ar: {e}"
             )
-        print(f"[ERRO HTTP] Código {e.response.status_code} - {e}")
 
-    except Exception as e:
-        print(
-            f"[ERRO DESCONHECIDO] Não foi possível obter dados de qualidade do ar: {e}"
-        )
+        return None
 
     return None
 
 
-def get_aqi(city: str, state: str, country: str) -> Optional[int]:
+def get_throttle_stats() -> Dict[str, float]:
     """
-    Retorna somente o índice de qualidade do ar (AQI) em padrão US para uma determinada cidade.
+    Retorna os contadores do limitador de taxa da AirVisual (requisições,
+    requisições atrasadas, tempo total de espera e pausas por 429).
+
+    Returns:
+        Dict[str, float]: Contadores do limitador.
+    """
+    return rate_limiter.stats()
+
+
+def get_response_cache() -> TieredCache:
+    """
+    Retorna o cache de respostas da AirVisual, criando-o (e abrindo o
+    armazenamento em RESPONSE_CACHE_PATH) na primeira chamada.
+
+    Returns:
+        TieredCache: Cache de respostas compartilhado.
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = TieredCache(
+                    storage_path=RESPONSE_CACHE_PATH or None,
+                    ttl_hours={"airvisual": RESPONSE_TTL_HOURS},
+                )
+    return _response_cache
+
+
+def get_cached_air_quality(city: str, state: str, country: str) -> Optional[dict]:
+    """
+    Versão de get_air_quality com cache por cidade, para que AQI e dados de
+    clima reutilizem a mesma resposta da API. O cache é um LRU em memória na
+    frente de um armazenamento persistente (AIRVISUAL_CACHE_PATH), de modo que
+    respostas ainda válidas também são reaproveitadas entre execuções.
 
     Args:
         city (str): Nome da cidade.
@@ -62,18 +153,80 @@ def get_aqi(city: str, state: str, country: str) -> Optional[int]:
         country (str): Nome do país.
 
     Returns:
-        Optional[int]: Valor do AQI ou None caso não consiga obter o dado.
+        Optional[dict]: Dados da qualidade do ar, ou None em caso de erro.
     """
-    air_quality_data = get_air_quality(city=city, state=state, country=country)
-    if not air_quality_data:
-        return None
+    return get_response_cache().get(
+        "airvisual",
+        f"{city}|{state}|{country}",
+        lambda: get_air_quality(city=city, state=state, country=country),
+    )
+
 
+def parse_city_environment(
+    air_quality_data: Optional[dict],
+) -> Optional[CityEnvironment]:
+    """
+    Converte a resposta da AirVisual em um CityEnvironment.
+
+    Args:
+        air_quality_data (dict | None): Resposta de get_air_quality.
+
+    Returns:
+        CityEnvironment | None: Dados ambientais, ou None se a resposta for inválida.
+    """
     try:
-        return air_quality_data["data"]["current"]["pollution"]["aqius"]
+        current = air_quality_data["data"]["current"]
     except (KeyError, TypeError):
-        # Estrutura inesperada ou dados faltantes
         return None
 
+    pollution = current.get("pollution") or {}
+    weather = current.get("weather") or {}
+    return CityEnvironment(
+        aqi=pollution.get("aqius"),
+        main_pollutant=pollution.get("mainus"),
+        temperature_c=weather.get("tp"),
+        humidity=weather.get("hu"),
+        wind_speed=weather.get("ws"),
+    )
+
+
+@instrumented("airvisual.get_city_environment")
+def get_city_environment(
+    city: str, state: str, country: str
+) -> Optional[CityEnvironment]:
+    """
+    Retorna AQI, principal poluente, temperatura, umidade e vento de uma cidade
+    a partir de uma única resposta (em cache) da AirVisual.
+
+    Args:
+        city (str): Nome da cidade.
+        state (str): Nome do estado ou distrito.
+        country (str): Nome do país.
+
+    Returns:
+        CityEnvironment | None: Dados ambientais, ou None caso não consiga obter.
+    """
+    return parse_city_environment(get_cached_air_quality(city, state, country))
+
+
+@instrumented("airvisual.get_aqi")
+def get_aqi(city: str, state: str, country: str) -> Optional[int]:
+    """
+    Retorna somente o índice de qualidade do ar (AQI) em padrão US para uma determinada cidade.
+
+    Args:
+        city (str): Nome da cidade.
+        state (str): Nome do estado ou distrito.
+        country (str): Nome do país.
+
+    Returns:
+        Optional[int]: Valor do AQI ou None caso não consiga obter o dado.
+    """
+    environment = get_city_environment(city=city, state=state, country=country)
+    if environment is None:
+        return None
+    return environment.aqi
+
 
 if __name__ == "__main__":
     city = "São Paulo"
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from api import airvisual_api, countries_api, weather_api
+from api.countries_api import CountryCatalog
+from api.http_client import POOL_MAXSIZE
+from api.rate_limiter import backoff_delay, parse_retry_after
+from instrumentation.metrics import get_registry, instrumented, record_http_response
+
+MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "20"))
+REQUEST_TIMEOUT_SECONDS = 10
+
+
+class AsyncApiClient:
+    """
+    Cliente assíncrono das APIs de clima, qualidade do ar e países, com uma
+    única aiohttp.ClientSession (pool de conexões compartilhado) e um semáforo
+    que limita as requisições simultâneas.
+
+    Deve ser usado como context manager assíncrono:
+
+        async with AsyncApiClient() as client:
+            temperatura = await client.get_temperature("Lisboa")
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        limit_per_host: int = POOL_MAXSIZE,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._catalog_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency, limit_per_host=self.limit_per_host
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+            )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Fecha a sessão HTTP, se ela foi criada por este cliente.
+        """
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+
+    async def _get_json(self, url: str, params: Optional[dict] = None) -> Any:
+        # Ao contrário do requests, o aiohttp não aceita parâmetros None
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        async with self._semaphore:
+            start = time.perf_counter()
+            async with self._session.get(url, params=params) as response:
+                body = await response.read()
+                record_http_response(
+                    urlsplit(str(response.url)).netloc,
+                    response.status,
+                    time.perf_counter() - start,
+                    len(body),
+                )
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    @instrumented("async.weather.get_temperature")
+    async def get_temperature(
+        self, city: str, api_key: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Consulta a temperatura atual de uma cidade usando a WeatherAPI.
+
+        Args:
+            city (str): Nome da cidade.
+            api_key (str, opcional): Chave da WeatherAPI. Padrão é WEATHER_KEY.
+
+        Returns:
+            Optional[float]: Temperatura atual em Celsius ou None em caso de erro.
+        """
+        params = {"key": api_key or weather_api.API_KEY, "q": city, "lang": "pt"}
+        try:
+            data = await self._get_json(weather_api.WEATHER_API_URL, params)
+            return data["current"]["temp_c"]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[NETWORK ERROR] City: {city} - {e}")
+        except (KeyError, TypeError):
+            print(f"[FORMAT ERROR] City: {city} - Unexpected response.")
+        except Exception as e:
+            print(f"[UNKNOWN ERROR] City: {city} - {e}")
+        return None
+
+    @instrumented("async.airvisual.get_air_quality")
+    async def get_air_quality(
+        self,
+        city: str,
+        state: str,
+        country: str,
+        max_retries: int = airvisual_api.MAX_RETRIES,
+    ) -> Optional[dict]:
+        """
+        Consulta a qualidade do ar de uma cidade na AirVisual, respeitando o
+        mesmo limitador de taxa usado pelo cliente síncrono.
+
+        Args:
+            city (str): Nome da cidade.
+            state (str): Nome do estado ou distrito.
+            country (str): Nome do país.
+            max_retries (int): Número máximo de novas tentativas após um 429.
+
+        Returns:
+            Optional[dict]: Dados da qualidade do ar, ou None em caso de erro.
+        """
+        params = {
+            "city": city,
+            "state": state,
+            "country": country,
+            "key": os.environ.get("AIRVISUAL_KEY"),
+        }
+        limiter = airvisual_api.rate_limiter
+
+        for attempt in range(max_retries + 1):
+            wait = limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self._get_json(airvisual_api.AIRVISUAL_API_URL, params)
+
+            except aiohttp.ClientResponseError as e:
+                if e.status == 429 and attempt < max_retries:
+                    retry_after = parse_retry_after(
+                        (e.headers or {}).get("Retry-After")
+                    )
+                    wait = backoff_delay(attempt, retry_after)
+                    get_registry().inc(
+                        "api_throttled_total",
+                        help="Respostas 429 (limite de taxa)",
+                        api="airvisual",
+                    )
+                    print(
+                        f"[LIMITE ALCANÇADO] Aguardando {wait:.1f} segundos antes de tentar novamente..."
+                    )
+                    limiter.pause(wait)
+                    continue
+                print(f"[ERRO HTTP] Código {e.status} - {e}")
+
+            except Exception as e:
+                print(
+                    f"[ERRO DESCONHECIDO] Não foi possível obter dados de qualidade do ar: {e}"
+                )
+
+            return None
+
+        return None
+
+    @instrumented("async.airvisual.get_aqi")
+    async def get_aqi(self, city: str, state: str, country: str) -> Optional[int]:
+        """
+        Retorna somente o AQI (padrão US) de uma cidade.
+        """
+        data = await self.get_air_quality(city, state, country)
+        environment = airvisual_api.parse_city_environment(data)
+        return environment.aqi if environment else None
+
+    @instrumented("async.countries.get_country_catalog")
+    async def get_country_catalog(self) -> CountryCatalog:
+        """
+        Retorna o catálogo de países, usando o snapshot em disco quando válido
+        ou baixando os dados da API. O catálogo é compartilhado com o cliente
+        síncrono de countries_api.
+
+        Returns:
+            CountryCatalog: Catálogo de países.
+        """
+        async with self._catalog_lock:
+            if countries_api._catalog is not None:
+                return countries_api._catalog
+
+            catalog = CountryCatalog.from_snapshot()
+            if catalog is None:
+                try:
+                    countries_data = await self._get_json(
+                        countries_api.COUNTRIES_API_URL,
+                        {"fields": countries_api.COUNTRIES_FIELDS},
+                    )
+                    catalog = CountryCatalog.from_api_data(countries_data)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    catalog = CountryCatalog.from_snapshot(max_age_hours=None)
+                    if catalog is None:
+                        raise
+                    print(
+                        f"[SNAPSHOT EXPIRADO] API indisponível, usando snapshot antigo: {e}"
+                    )
+
+            countries_api.set_country_catalog(catalog)
+            return catalog
+
+
+async def get_temperature(
+    city: str, client: Optional[AsyncApiClient] = None
+) -> Optional[float]:
+    """
+    Versão assíncrona de weather_api.get_temperature. Sem client, abre uma
+    sessão apenas para esta chamada; para lotes use um AsyncApiClient.
+    """
+    if client is not None:
+        return await client.get_temperature(city)
+    async with AsyncApiClient() as own_client:
+        return await own_client.get_temperature(city)
+
+
+async def get_air_quality(
+    city: str, state: str, country: str, client: Optional[AsyncApiClient] = None
+) -> Optional[dict]:
+    """
+    Versão assíncrona de airvisual_api.get_air_quality. Sem client, abre uma
+    sessão apenas para esta chamada; para lotes use um AsyncApiClient.
+    """
+    if client is not None:
+        return await client.get_air_quality(city, state, country)
+    async with AsyncApiClient() as own_client:
+        return await own_client.get_air_quality(city, state, country)
+
+
+async def get_country_catalog(
+    client: Optional[AsyncApiClient] = None,
+) -> CountryCatalog:
+    """
+    Versão assíncrona de countries_api.get_country_catalog.
+    """
+    if client is not None:
+        return await client.get_country_catalog()
+    async with AsyncApiClient() as own_client:
+        return await own_client.get_country_catalog()
+
+
+async def _gather(
+    keys: Iterable[Hashable], method_name: str, max_concurrency: int
+) -> Dict[Hashable, Any]:
+    unique_keys = list(dict.fromkeys(keys))
+    async with AsyncApiClient(max_concurrency=max_concurrency) as client:
+        method = getattr(client, method_name)
+        results = await asyncio.gather(
+            *(
+                method(*key) if isinstance(key, tuple) else method(key)
+                for key in unique_keys
+            )
+        )
+    return dict(zip(unique_keys, results))
+
+
+def fetch_temperatures(
+    cities: Iterable[str], max_concurrency: int = MAX_CONCURRENCY
+) -> Dict[str, Optional[float]]:
+    """
+    Fachada síncrona: busca a temperatura de várias cidades (sem repetições)
+    em um único event loop, com no máximo max_concurrency requisições
+    simultâneas.
+
+    Args:
+        cities (Iterable[str]): Cidades a consultar.
+        max_concurrency (int): Limite de requisições simultâneas.
+
+    Returns:
+        Dict[str, float | None]: Dicionário cidade -> temperatura.
+    """
+    return asyncio.run(_gather(cities, "get_temperature", max_concurrency))
+
+
+def fetch_aqi(
+    locations: Iterable[Tuple[str, str, str]], max_concurrency: int = MAX_CONCURRENCY
+) -> Dict[Tuple[str, str, str], Optional[int]]:
+    """
+    Fachada síncrona: busca o AQI de várias localizações (cidade, estado, país)
+    em um único event loop, respeitando o limitador de taxa da AirVisual.
+
+    Args:
+        locations (Iterable[Tuple[str, str, str]]): Tuplas (cidade, estado, país).
+        max_concurrency (int): Limite de requisições simultâneas.
+
+    Returns:
+        Dict[Tuple[str, str, str], int | None]: Dicionário localização -> AQI.
+    """
+    return asyncio.run(_gather(locations, "get_aqi", max_concurrency))
+
+
+if __name__ == "__main__":
+    print(fetch_temperatures(["São Paulo", "Lisboa", "Cajuru"]))
@@ -1,13 +1,368 @@
-from typing import Optional, Union
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
-from rapidfuzz import process
+from rapidfuzz import fuzz, process
+
+from api.http_client import get_session
+from instrumentation.metrics import instrumented
+
+COUNTRIES_API_URL = os.getenv("COUNTRIES_API_URL", "https://restcountries.com/v3.1/all")
+COUNTRIES_FIELDS = "name,cca2,cca3,population,continents"
+SNAPSHOT_PATH = "data/cache/countries_snapshot.json"
+SNAPSHOT_MAX_AGE_HOURS = 24 * 7
+RESOLVED_NAMES_PATH = "data/cache/countries_resolved_names.json"
+FUZZY_SCORE_CUTOFF = 70
+FUZZY_WORKERS = int(os.getenv("FUZZY_WORKERS", "-1"))
+
+
+class CountryCatalog:
+    """
+    Catálogo em memória dos países da API restcountries.com, indexado por nome
+    comum, nome oficial e códigos ISO (cca2/cca3).
+
+    Buscas exatas são resolvidas em O(1) pelos índices; as demais usam fuzzy
+    matching sobre uma lista de nomes pré-calculada. Os nomes já resolvidos
+    por fuzzy matching ficam memorizados (nome -> nome comum, pontuação) e
+    podem ser atualizados por várias threads ao mesmo tempo. Nomes sem
+    correspondência só são memorizados em memória, junto com a pontuação
+    mínima usada, e são buscados de novo com uma pontuação mínima menor.
+    """
+
+    def __init__(
+        self,
+        countries: List[dict],
+        resolved_names: Optional[Dict[str, Tuple[str, float]]] = None,
+    ):
+        self.countries = countries
+        self.resolved_names: Dict[str, Tuple[str, float]] = dict(resolved_names or {})
+        self._misses: Dict[str, float] = {}
+        self._resolved_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.choices: List[str] = []
+        self._choice_countries: List[dict] = []
+        self._by_name: Dict[str, dict] = {}
+        self._by_code: Dict[str, dict] = {}
+
+        for country in countries:
+            names = country.get("name") or {}
+            for name in (names.get("common"), names.get("official")):
+                if not name:
+                    continue
+                self._by_name.setdefault(name.casefold(), country)
+                self.choices.append(name)
+                self._choice_countries.append(country)
+
+            for code_field in ("cca2", "cca3"):
+                code = country.get(code_field)
+                if code:
+                    self._by_code[code.upper()] = country
+
+    @classmethod
+    @instrumented("countries.load_catalog")
+    def load(
+        cls,
+        snapshot_path: str = SNAPSHOT_PATH,
+        max_age_hours: float = SNAPSHOT_MAX_AGE_HOURS,
+    ) -> "CountryCatalog":
+        """
+        Carrega o catálogo do snapshot em disco, se ainda válido, ou baixa os
+        dados da API e atualiza o snapshot. Se a API falhar, usa o snapshot
+        existente mesmo que expirado.
+
+        Args:
+            snapshot_path (str): Caminho do snapshot JSON.
+            max_age_hours (float): Idade máxima do snapshot em horas.
+
+        Returns:
+            CountryCatalog: Catálogo carregado.
+        """
+        catalog = cls.from_snapshot(snapshot_path, max_age_hours)
+        if catalog is not None:
+            return catalog
+
+        try:
+            response = get_session().get(
+                COUNTRIES_API_URL, params={"fields": COUNTRIES_FIELDS}, timeout=10
+            )
+            response.raise_for_status()
+            countries_data = response.json()
+        except requests.RequestException as e:
+            catalog = cls.from_snapshot(snapshot_path, max_age_hours=None)
+            if catalog is None:
+                raise
+            print(f"[SNAPSHOT EXPIRADO] API indisponível, usando snapshot antigo: {e}")
+            return catalog
+
+        return cls.from_api_data(countries_data, snapshot_path)
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot_path: str = SNAPSHOT_PATH,
+        max_age_hours: Optional[float] = SNAPSHOT_MAX_AGE_HOURS,
+    ) -> Optional["CountryCatalog"]:
+        """
+        Carrega o catálogo do snapshot em disco, se existir e não for mais
+        antigo que max_age_hours (None aceita qualquer idade).
+
+        Returns:
+            CountryCatalog | None: Catálogo, ou None se não houver snapshot válido.
+        """
+        if not os.path.exists(snapshot_path):
+            return None
+        age_hours = (time.time() - os.path.getmtime(snapshot_path)) / 3600
+        if max_age_hours is not None and age_hours >= max_age_hours:
+            return None
+        return cls(_read_snapshot(snapshot_path), _read_resolved_names())
+
+    @classmethod
+    def from_api_data(
+        cls, countries_data: List[dict], snapshot_path: str = SNAPSHOT_PATH
+    ) -> "CountryCatalog":
+        """
+        Cria o catálogo a partir da resposta da API e atualiza o snapshot.
+
+        Returns:
+            CountryCatalog: Catálogo criado.
+        """
+        try:
+            _write_snapshot(snapshot_path, countries_data)
+        except OSError as e:
+            print(f"[ERRO] Não foi possível salvar o snapshot de países: {e}")
+        return cls(countries_data, _read_resolved_names())
+
+    def _exact_match(self, country_name: str) -> Optional[dict]:
+        country = self._by_name.get(country_name.casefold())
+        if country is None:
+            country = self._by_code.get(country_name.upper())
+        return country
+
+    def _from_resolved(
+        self, country_name: str, score_cutoff: float
+    ) -> Tuple[bool, Optional[dict], float]:
+        resolved = self.resolved_names.get(country_name)
+        if resolved is not None:
+            country = self._by_name.get(resolved[0].casefold())
+            # País ausente do catálogo atual (ex.: snapshot atualizado): refaz
+            if country is not None:
+                return True, country, resolved[1]
+        # Uma falha com pontuação mínima igual ou menor continua valendo
+        missed_cutoff = self._misses.get(country_name)
+        if missed_cutoff is not None and missed_cutoff <= score_cutoff:
+            return True, None, 0.0
+        return False, None, 0.0
+
+    def lookup(
+        self, country_name: str, score_cutoff: float = FUZZY_SCORE_CUTOFF
+    ) -> Optional[dict]:
+        """
+        Busca um país pelo nome (comum ou oficial) ou código ISO, recorrendo ao
+        fuzzy matching quando não há correspondência exata.
+
+        Args:
+            country_name (str): Nome ou código do país.
+            score_cutoff (float): Pontuação mínima aceita no fuzzy matching.
+
+        Returns:
+            dict | None: Dados do país, ou None se não encontrado.
+        """
+        country = self._exact_match(country_name)
+        if country is not None:
+            return country
+
+        found, country, _ = self._from_resolved(country_name, score_cutoff)
+        if found:
+            return country
+
+        result = process.extractOne(
+            country_name, self.choices, score_cutoff=score_cutoff
+        )
+        if result is None:
+            with self._resolved_lock:
+                self._misses[country_name] = score_cutoff
+            return None
+
+        _, score, index = result
+        country = self._choice_countries[index]
+        with self._resolved_lock:
+            self.resolved_names[country_name] = (country["name"]["common"], score)
+        return country
+
+    def resolve_names(
+        self,
+        country_names: Iterable[str],
+        score_cutoff: float = FUZZY_SCORE_CUTOFF,
+        workers: int = FUZZY_WORKERS,
+    ) -> Tuple[Dict[str, Optional[dict]], Dict[str, float]]:
+        """
+        Resolve uma coleção de nomes de países de uma só vez. Os nomes são
+        deduplicados, as correspondências exatas e já memorizadas são usadas
+        diretamente e os demais são comparados em lote com rapidfuzz.cdist,
+        usando múltiplos núcleos.
+
+        Args:
+            country_names (Iterable[str]): Nomes dos países (podem repetir).
+            score_cutoff (float): Pontuação mínima aceita no fuzzy matching.
+            workers (int): Núcleos usados pelo cdist (-1 usa todos).
+
+        Returns:
+            Tuple[Dict[str, dict | None], Dict[str, float]]: Mapeamento
+            nome -> dados do país e nome -> pontuação da correspondência.
+        """
+        mapping: Dict[str, Optional[dict]] = {}
+        scores: Dict[str, float] = {}
+        pending: List[str] = []
+
+        for name in dict.fromkeys(country_names):
+            if not isinstance(name, str):
+                continue
+            country = self._exact_match(name)
+            if country is not None:
+                mapping[name], scores[name] = country, 100.0
+                continue
+            found, country, score = self._from_resolved(name, score_cutoff)
+            if found:
+                mapping[name], scores[name] = country, score
+                continue
+            pending.append(name)
+
+        if pending:
+            matrix = process.cdist(
+                pending,
+                self.choices,
+                scorer=fuzz.WRatio,
+                score_cutoff=score_cutoff,
+                workers=workers,
+            )
+            best_indexes = matrix.argmax(axis=1)
+            resolved: Dict[str, Tuple[str, float]] = {}
+            misses: Dict[str, float] = {}
+            for row, name in enumerate(pending):
+                index = int(best_indexes[row])
+                score = float(matrix[row, index])
+                if score < score_cutoff:
+                    mapping[name], scores[name] = None, 0.0
+                    misses[name] = score_cutoff
+                    continue
+                country = self._choice_countries[index]
+                mapping[name], scores[name] = country, score
+                resolved[name] = (country["name"]["common"], score)
+
+            with self._resolved_lock:
+                self.resolved_names.update(resolved)
+                self._misses.update(misses)
+            if resolved:
+                self._save_resolved_names()
+
+        return mapping, scores
+
+    def _save_resolved_names(self) -> None:
+        # Grava uma cópia tirada sob o lock; o lock de escrita garante que uma
+        # cópia mais antiga não sobrescreva uma mais nova no disco
+        with self._write_lock:
+            with self._resolved_lock:
+                snapshot = dict(self.resolved_names)
+            try:
+                _write_resolved_names(snapshot)
+            except OSError as e:
+                print(
+                    f"[ERRO] Não foi possível salvar os nomes de países resolvidos: {e}"
+                )
+
+
+def _read_snapshot(snapshot_path: str) -> List[dict]:
+    with open(snapshot_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _write_json(path: str, data) -> None:
+    # Arquivo temporário exclusivo: gravações simultâneas não disputam o mesmo .tmp
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_snapshot(snapshot_path: str, countries_data: List[dict]) -> None:
+    _write_json(snapshot_path, countries_data)
+
+
+def _read_resolved_names(
+    path: str = RESOLVED_NAMES_PATH,
+) -> Dict[str, Tuple[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            # Falhas gravadas por versões anteriores ([null, 0.0]) são ignoradas
+            return {
+                name: tuple(value)
+                for name, value in json.load(file).items()
+                if value[0] is not None
+            }
+    except (OSError, ValueError) as e:
+        print(f"[ERRO] Não foi possível ler os nomes de países resolvidos: {e}")
+        return {}
+
+
+def _write_resolved_names(
+    resolved_names: Dict[str, Tuple[str, float]],
+    path: str = RESOLVED_NAMES_PATH,
+) -> None:
+    _write_json(path, resolved_names)
+
+
+_catalog: Optional[CountryCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_country_catalog() -> CountryCatalog:
+    """
+    Retorna o catálogo de países compartilhado, carregando-o uma única vez por
+    processo.
+
+    Returns:
+        CountryCatalog: Catálogo de países.
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CountryCatalog.load()
+    return _catalog
+
+
+def set_country_catalog(catalog: Optional[CountryCatalog]) -> None:
+    """
+    Define o catálogo de países compartilhado (por exemplo, carregado pelo
+    cliente assíncrono). None força um novo carregamento na próxima consulta.
+
+    Args:
+        catalog (CountryCatalog | None): Catálogo a ser compartilhado.
+    """
+    global _catalog
+    with _catalog_lock:
+        _catalog = catalog
 
 
 def _get_country_data(country_name: str) -> Optional[dict]:
     """
-    Obtém os dados completos de um país a partir de seu nome, usando fuzzy matching
-    com dados da API pública restcountries.com.
+    Obtém os dados completos de um país a partir de seu nome, usando o catálogo
+    de países carregado da API pública restcountries.com.
 
     Args:
         country_name (str): Nome do país (comum ou oficial) a ser consultado.
@@ -16,31 +371,10 @@ def _get_country_data(country_name: str) -> Optional[dict]:
         dict | None: Dicionário com os dados do país, ou None se não encontrado.
     """
     try:
-        response = requests.get("https://restcountries.com/v3.1/all", timeout=10)
-        response.raise_for_status()
-        countries_data = response.json()
-
-        country_names = []
-        for country in countries_data:
-            country_names.append(country["name"]["common"])
-            country_names.append(country["name"].get("official", ""))
-
-        match, score, _ = process.extractOne(
-            country_name, country_names, score_cutoff=70
-        )
-        if not match:
+        country = get_country_catalog().lookup(country_name)
+        if country is None:
             print(f"Não encontrou correspondência próxima para '{country_name}'.")
-            return None
-
-        for country in countries_data:
-            if match in (
-                country["name"]["common"],
-                country["name"].get("official", ""),
-            ):
-                return country
-
-        print(f"País correspondente a '{country_name}' não encontrado nos dados.")
-        return None
+        return country
 
     except requests.RequestException as e:
         print(f"Erro de requisição ao consultar dados do país: {e}")
@@ -50,6 +384,7 @@ def _get_country_data(country_name: str) -> Optional[dict]:
     return None
 
 
+@instrumented("countries.get_population")
 def get_population(country_name: str) -> Optional[int]:
     """
     Obtém a população de um país, a partir de seu nome, consultando a API restcountries.com.
@@ -66,6 +401,57 @@ def get_population(country_name: str) -> Optional[int]:
     return None
 
 
+def _first_continent(country_data: Optional[dict]) -> Optional[str]:
+    if not country_data:
+        return None
+    continents = country_data.get("continents")
+    return continents[0] if continents else None
+
+
+@instrumented("countries.get_populations")
+def get_populations(country_names: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    Obtém a população de vários países de uma só vez, resolvendo os nomes em
+    lote no catálogo de países.
+
+    Args:
+        country_names (Iterable[str]): Nomes dos países (podem repetir).
+
+    Returns:
+        Dict[str, int | None]: Dicionário nome -> população.
+    """
+    try:
+        mapping, _ = get_country_catalog().resolve_names(country_names)
+    except Exception as e:
+        print(f"Erro inesperado ao buscar dados dos países: {e}")
+        return {}
+    return {
+        name: country.get("population") if country else None
+        for name, country in mapping.items()
+    }
+
+
+@instrumented("countries.get_continents")
+def get_continents(country_names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Obtém o continente de vários países de uma só vez, resolvendo os nomes em
+    lote no catálogo de países.
+
+    Args:
+        country_names (Iterable[str]): Nomes dos países (podem repetir).
+
+    Returns:
+        Dict[str, str | None]: Dicionário nome -> continente.
+    """
+    try:
+        mapping, _ = get_country_catalog().resolve_names(country_names)
+    except Exception as e:
+        print(f"Erro inesperado ao buscar dados dos países: {e}")
+        return {}
+    return {name: _first_continent(country) for name, country in mapping.items()}
+
+
+@instrumented("countries.get_continent")
 def get_continent(country_name: str) -> Optional[str]:
     """
     Obtém o continente de um país, a partir de seu nome, consultando a API restcountries.com.
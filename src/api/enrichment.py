@@ -0,0 +1,345 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from api.airvisual_api import CityEnvironment, get_aqi, get_city_environment
+from api.weather_api import get_temperature
+from cache.tiered_cache import TieredCache
+
+MAX_WORKERS = int(os.getenv("ENRICHMENT_MAX_WORKERS", "8"))
+
+ENVIRONMENT_COLUMNS = {
+    "aqi": "aqi",
+    "main_pollutant": "poluente_principal",
+    "temperature_c": "temperatura_c",
+    "humidity": "umidade",
+    "wind_speed": "vento_ms",
+}
+
+Location = Tuple[str, str, str]
+
+
+def _chave_valida(key: Hashable) -> bool:
+    valores = key if isinstance(key, tuple) else (key,)
+    return all(not pd.isna(valor) for valor in valores)
+
+
+def fetch_concurrently(
+    keys: Iterable[Hashable],
+    fetch_func: Callable[..., Any],
+    max_workers: int = MAX_WORKERS,
+) -> Dict[Hashable, Any]:
+    """
+    Executa fetch_func uma única vez por chave distinta, em paralelo, usando um
+    pool de threads limitado.
+
+    Chaves do tipo tupla são desempacotadas como argumentos posicionais.
+    Chaves nulas são ignoradas e erros viram None no resultado.
+
+    Args:
+        keys (Iterable[Hashable]): Chaves a consultar (podem conter repetições).
+        fetch_func (Callable[..., Any]): Função que busca o dado de uma chave.
+        max_workers (int): Número máximo de requisições simultâneas.
+
+    Returns:
+        Dict[Hashable, Any]: Dicionário chave -> resultado.
+    """
+    unique_keys: List[Hashable] = [
+        key for key in dict.fromkeys(keys) if _chave_valida(key)
+    ]
+    if not unique_keys:
+        return {}
+
+    def _fetch_seguro(key: Hashable) -> Any:
+        try:
+            if isinstance(key, tuple):
+                return fetch_func(*key)
+            return fetch_func(key)
+        except Exception as e:
+            print(f"[ERRO ENRIQUECIMENTO] Chave: {key} - {e}")
+            return None
+
+    workers = max(1, min(max_workers, len(unique_keys)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_fetch_seguro, unique_keys))
+
+    return dict(zip(unique_keys, results))
+
+
+@dataclass
+class EnrichmentLookup:
+    """
+    Tabela de enriquecimento compartilhada entre pipelines: dados ambientais
+    da AirVisual por (cidade, estado, país) e temperaturas da WeatherAPI por
+    cidade, cada chave resolvida uma única vez (ver build_enrichment_lookup).
+    """
+
+    environments: Dict[Location, Optional[CityEnvironment]] = field(
+        default_factory=dict
+    )
+    temperatures: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    def aqi(self, city: str, state: str, country: str) -> Optional[int]:
+        """
+        Retorna o AQI da tabela, consultando a API só se a localização não
+        estiver nela.
+        """
+        key = (city, state, country)
+        if key not in self.environments:
+            return get_aqi(city, state, country)
+        environment = self.environments[key]
+        return environment.aqi if environment else None
+
+
+def build_enrichment_lookup(
+    locations: Iterable[Location] = (),
+    cities: Iterable[str] = (),
+    use_airvisual_temperature: bool = True,
+    max_workers: int = MAX_WORKERS,
+) -> EnrichmentLookup:
+    """
+    Resolve, uma única vez cada, a união das localizações e cidades de vários
+    pipelines.
+
+    As localizações são consultadas na AirVisual; as cidades, na WeatherAPI
+    (em paralelo com a AirVisual). Depois, a WeatherAPI é consultada apenas
+    para as cidades das localizações sem temperatura na AirVisual (ou para
+    todas, sem use_airvisual_temperature) que ainda não estejam na tabela.
+
+    Args:
+        locations (Iterable[Location]): Tuplas (cidade, estado, país).
+        cities (Iterable[str]): Cidades que precisam apenas de temperatura.
+        use_airvisual_temperature (bool): Aproveita a temperatura da AirVisual.
+        max_workers (int): Número máximo de requisições simultâneas por API.
+
+    Returns:
+        EnrichmentLookup: Tabela compartilhada.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future_temperatures = executor.submit(
+            fetch_concurrently, cities, get_temperature, max_workers
+        )
+        environments = fetch_concurrently(locations, get_city_environment, max_workers)
+        temperatures = future_temperatures.result()
+
+    faltantes = [
+        city
+        for (city, _, _), environment in environments.items()
+        if city not in temperatures
+        and (
+            not use_airvisual_temperature
+            or environment is None
+            or environment.temperature_c is None
+        )
+    ]
+    temperatures.update(fetch_concurrently(faltantes, get_temperature, max_workers))
+    return EnrichmentLookup(environments, temperatures)
+
+
+def _com_cache(
+    fetch_func: Callable[..., Any], cache: Optional[TieredCache], namespace: str
+) -> Callable[..., Any]:
+    """
+    Envolve fetch_func para consultar o cache em camadas antes da API.
+    """
+    if cache is None:
+        return fetch_func
+
+    def _fetch(*args: Any) -> Any:
+        key = "|".join(str(arg) for arg in args)
+        return cache.get(namespace, key, lambda: fetch_func(*args))
+
+    return _fetch
+
+
+def _junta_resultados(
+    df: pd.DataFrame,
+    columns: List[str],
+    lookup: Dict[Hashable, Any],
+    target: str,
+) -> pd.DataFrame:
+    """
+    Junta o dicionário de resultados ao DataFrame de forma vetorizada (merge),
+    preservando a ordem e o índice originais.
+    """
+    keys = list(lookup.keys())
+    if len(columns) == 1:
+        df_lookup = pd.DataFrame({columns[0]: keys})
+    else:
+        df_lookup = pd.DataFrame(keys, columns=columns)
+    df_lookup[target] = list(lookup.values())
+    return _junta_tabela(df, columns, df_lookup)
+
+
+def _junta_tabela(
+    df: pd.DataFrame, columns: List[str], df_lookup: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Junta as colunas de df_lookup (exceto as chaves) ao DataFrame via merge,
+    preservando a ordem e o índice originais.
+    """
+    df = df.copy()
+    targets = [column for column in df_lookup.columns if column not in columns]
+    if df_lookup.empty:
+        for target in targets:
+            df[target] = None
+        return df
+
+    merged = df[columns].merge(df_lookup, on=columns, how="left")
+    for target in targets:
+        df[target] = merged[target].to_numpy()
+    return df
+
+
+def enrich_temperatures(
+    df: pd.DataFrame,
+    column: str = "city",
+    target: str = "temperatura_c",
+    max_workers: int = MAX_WORKERS,
+    cache: Optional[TieredCache] = None,
+    lookup: Optional[EnrichmentLookup] = None,
+) -> pd.DataFrame:
+    """
+    Adiciona a temperatura atual de cada cidade consultando a WeatherAPI uma
+    única vez por cidade distinta, com requisições concorrentes.
+
+    Cidades presentes na tabela compartilhada (lookup) não são consultadas
+    novamente.
+
+    Args:
+        df (pd.DataFrame): DataFrame contendo a coluna de cidades.
+        column (str): Nome da coluna com as cidades. Padrão é 'city'.
+        target (str): Nome da coluna de saída. Padrão é 'temperatura_c'.
+        max_workers (int): Número máximo de requisições simultâneas.
+        cache (TieredCache, opcional): Cache consultado antes da API
+            (namespace 'weather').
+        lookup (EnrichmentLookup, opcional): Tabela compartilhada com
+            temperaturas já obtidas.
+
+    Returns:
+        pd.DataFrame: Cópia do DataFrame com a coluna de temperatura adicionada.
+    """
+    temperatures = dict(lookup.temperatures) if lookup else {}
+    faltantes = [city for city in df[column] if city not in temperatures]
+    fetch_func = _com_cache(get_temperature, cache, "weather")
+    temperatures.update(fetch_concurrently(faltantes, fetch_func, max_workers))
+    return _junta_resultados(df, [column], temperatures, target)
+
+
+def enrich_aqi(
+    df: pd.DataFrame,
+    city_column: str = "cidade",
+    state_column: str = "estado",
+    country_column: str = "pais",
+    target: str = "aqi",
+    max_workers: int = MAX_WORKERS,
+    cache: Optional[TieredCache] = None,
+    lookup: Optional[EnrichmentLookup] = None,
+) -> pd.DataFrame:
+    """
+    Adiciona o AQI (padrão US) de cada cidade consultando a AirVisual uma única
+    vez por combinação distinta de cidade, estado e país, com requisições
+    concorrentes.
+
+    Args:
+        df (pd.DataFrame): DataFrame com as colunas de cidade, estado e país.
+        city_column (str): Coluna com o nome da cidade. Padrão é 'cidade'.
+        state_column (str): Coluna com o estado/distrito. Padrão é 'estado'.
+        country_column (str): Coluna com o país. Padrão é 'pais'.
+        target (str): Nome da coluna de saída. Padrão é 'aqi'.
+        max_workers (int): Número máximo de requisições simultâneas.
+        cache (TieredCache, opcional): Cache consultado antes da API
+            (namespace 'aqi').
+        lookup (EnrichmentLookup, opcional): Tabela compartilhada; só as
+            localizações ausentes dela são consultadas na API.
+
+    Returns:
+        pd.DataFrame: Cópia do DataFrame com a coluna de AQI adicionada.
+    """
+    columns = [city_column, state_column, country_column]
+    keys = df[columns].itertuples(index=False, name=None)
+    fetch_func = _com_cache(lookup.aqi if lookup else get_aqi, cache, "aqi")
+    aqi_values = fetch_concurrently(keys, fetch_func, max_workers)
+    return _junta_resultados(df, columns, aqi_values, target)
+
+
+def _colunas_ambiente(environment: Optional[CityEnvironment]) -> Dict[str, Any]:
+    return {
+        column: getattr(environment, field) if environment else None
+        for field, column in ENVIRONMENT_COLUMNS.items()
+    }
+
+
+def enrich_environment(
+    df: pd.DataFrame,
+    city_column: str = "cidade",
+    state_column: str = "estado",
+    country_column: str = "pais",
+    use_airvisual_temperature: bool = True,
+    max_workers: int = MAX_WORKERS,
+    lookup: Optional[EnrichmentLookup] = None,
+) -> pd.DataFrame:
+    """
+    Adiciona AQI, principal poluente, temperatura, umidade e vento de cada
+    cidade a partir de uma única resposta da AirVisual por cidade distinta.
+
+    Com use_airvisual_temperature, a WeatherAPI só é consultada para as cidades
+    em que a AirVisual não retornou temperatura; caso contrário a temperatura
+    vem sempre da WeatherAPI.
+
+    Args:
+        df (pd.DataFrame): DataFrame com as colunas de cidade, estado e país.
+        city_column (str): Coluna com o nome da cidade. Padrão é 'cidade'.
+        state_column (str): Coluna com o estado/distrito. Padrão é 'estado'.
+        country_column (str): Coluna com o país. Padrão é 'pais'.
+        use_airvisual_temperature (bool): Usa a temperatura da AirVisual e
+            evita a chamada à WeatherAPI quando disponível. Padrão é True.
+        max_workers (int): Número máximo de requisições simultâneas.
+        lookup (EnrichmentLookup, opcional): Tabela compartilhada; só as
+            localizações e cidades ausentes dela são consultadas nas APIs.
+
+    Returns:
+        pd.DataFrame: Cópia do DataFrame com as colunas ambientais adicionadas.
+    """
+    columns = [city_column, state_column, country_column]
+    keys = df[columns].itertuples(index=False, name=None)
+    environments = dict(lookup.environments) if lookup else {}
+    faltantes = [key for key in keys if key not in environments]
+    environments.update(
+        fetch_concurrently(faltantes, get_city_environment, max_workers)
+    )
+
+    df_lookup = pd.DataFrame(
+        [
+            {**dict(zip(columns, key)), **_colunas_ambiente(environment)}
+            for key, environment in environments.items()
+        ],
+        columns=columns + list(ENVIRONMENT_COLUMNS.values()),
+    )
+    df = _junta_tabela(df, columns, df_lookup)
+
+    temperature_column = ENVIRONMENT_COLUMNS["temperature_c"]
+    if use_airvisual_temperature:
+        sem_temperatura = df[temperature_column].isna()
+    else:
+        sem_temperatura = pd.Series(True, index=df.index)
+
+    if sem_temperatura.any():
+        df_weather = enrich_temperatures(
+            df.loc[sem_temperatura, [city_column]],
+            column=city_column,
+            target=temperature_column,
+            max_workers=max_workers,
+            lookup=lookup,
+        )
+        df.loc[sem_temperatura, temperature_column] = df_weather[temperature_column]
+
+    return df
+
+
+if __name__ == "__main__":
+    df_exemplo = pd.DataFrame({"city": ["São Paulo", "Lisboa", "São Paulo"]})
+    print(enrich_temperatures(df_exemplo, "city"))
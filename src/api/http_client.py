@@ -0,0 +1,126 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from instrumentation.metrics import record_http_response
+
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_adapter(
+    pool_connections: int, pool_maxsize: int, max_retries: int, backoff_factor: float
+) -> HTTPAdapter:
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+        # 429 fica a cargo de cada cliente (ex.: limitador da AirVisual)
+        respect_retry_after_header=False,
+    )
+    return HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=True,
+    )
+
+
+def _record_response(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+    record_http_response(
+        urlsplit(response.url).netloc,
+        response.status_code,
+        response.elapsed.total_seconds(),
+        len(response.content),
+    )
+
+
+def create_session(
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
+    max_retries: int = MAX_RETRIES,
+    backoff_factor: float = BACKOFF_FACTOR,
+    host_limits: Optional[Dict[str, int]] = None,
+) -> requests.Session:
+    """
+    Cria uma sessão HTTP com pool de conexões persistentes (keep-alive) e
+    política de novas tentativas para erros 5xx. Cada resposta é registrada
+    nas métricas HTTP (status, latência e bytes recebidos por host).
+
+    Args:
+        pool_connections (int): Quantidade de pools (hosts) mantidos em cache.
+        pool_maxsize (int): Máximo de conexões simultâneas por host.
+        max_retries (int): Número máximo de novas tentativas por requisição.
+        backoff_factor (float): Fator de espera exponencial entre tentativas.
+        host_limits (Dict[str, int], opcional): Limite de conexões específico por
+            prefixo de URL, ex.: {"http://api.airvisual.com": 2}.
+
+    Returns:
+        requests.Session: Sessão configurada.
+    """
+    session = requests.Session()
+    session.hooks["response"].append(_record_response)
+    adapter = _build_adapter(
+        pool_connections, pool_maxsize, max_retries, backoff_factor
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    for prefix, limit in (host_limits or {}).items():
+        session.mount(prefix, _build_adapter(1, limit, max_retries, backoff_factor))
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Retorna a sessão HTTP compartilhada pelos clientes de API, criando-a na
+    primeira chamada.
+
+    Returns:
+        requests.Session: Sessão compartilhada.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """
+    Substitui a sessão compartilhada, por exemplo por uma sessão apontando para
+    um servidor local de testes. Passar None descarta a sessão atual para que
+    uma nova seja criada na próxima chamada.
+
+    Args:
+        session (requests.Session | None): Sessão a ser usada pelos clientes.
+    """
+    global _session
+    with _session_lock:
+        _session = session
+
+
+def close_session() -> None:
+    """
+    Fecha a sessão compartilhada e libera as conexões do pool.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
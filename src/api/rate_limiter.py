@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    """
+    Limitador de taxa do tipo token bucket, compartilhado entre threads.
+
+    Cada requisição consome um token; os tokens são repostos continuamente à
+    taxa configurada até a capacidade máxima (rajada). Quem chega sem token
+    reserva o próximo e dorme apenas o tempo necessário, fora do lock.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled_requests = 0
+        self.throttled_seconds = 0.0
+        self.penalties = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Reserva um token e retorna quantos segundos o chamador deve esperar
+        antes de usá-lo (0 se houver token disponível).
+
+        Returns:
+            float: Tempo de espera em segundos.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = 0.0
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate_per_second
+            wait = max(wait, self._blocked_until - now)
+
+            self.requests += 1
+            if wait > 0:
+                self.throttled_requests += 1
+                self.throttled_seconds += wait
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Bloqueia até que uma requisição possa ser feita dentro da cota.
+
+        Returns:
+            float: Tempo efetivamente esperado em segundos.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Suspende todas as requisições pelo tempo informado, por exemplo após
+        uma resposta 429 do servidor.
+
+        Args:
+            seconds (float): Tempo de pausa em segundos.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.penalties += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Retorna os contadores do limitador.
+
+        Returns:
+            Dict[str, float]: Requisições, requisições atrasadas, segundos de
+            espera e pausas por 429.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled_requests": self.throttled_requests,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "penalties": self.penalties,
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos.
+
+    Args:
+        value (str | None): Valor do cabeçalho.
+
+    Returns:
+        float | None: Segundos de espera, ou None se ausente/inválido.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    base: float = BACKOFF_BASE_SECONDS,
+    cap: float = BACKOFF_MAX_SECONDS,
+) -> float:
+    """
+    Calcula o tempo de espera para uma nova tentativa com backoff exponencial
+    limitado e jitter ("full jitter"). Se o servidor informou Retry-After, ele
+    é usado como espera mínima.
+
+    Args:
+        attempt (int): Número da tentativa (0 para a primeira repetição).
+        retry_after (float, opcional): Espera sugerida pelo servidor.
+        base (float): Espera base em segundos.
+        cap (float): Espera máxima em segundos.
+
+    Returns:
+        float: Tempo de espera em segundos.
+    """
+    delay = random.uniform(0, min(cap, base * (2**attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -4,10 +4,17 @@ from typing import Optional
 import requests
 from dotenv import load_dotenv
 
+from api.http_client import get_session
+from instrumentation.metrics import instrumented
+
 load_dotenv()
 API_KEY = os.getenv("WEATHER_KEY")
+WEATHER_API_URL = os.getenv(
+    "WEATHER_API_URL", "https://api.weatherapi.com/v1/current.json"
+)
 
 
+@instrumented("weather.get_temperature")
 def get_temperature(city: str, api_key: str = API_KEY) -> Optional[float]:
     """
     Consulta a temperatura atual de uma cidade usando a WeatherAPI.
@@ -19,11 +26,10 @@ def get_temperature(city: str, api_key: str = API_KEY) -> Optional[float]:
     Returns:
         Optional[float]: Temperatura atual em Celsius ou None em caso de erro.
     """
-    url = "https://api.weatherapi.com/v1/current.json"
     params = {"key": api_key, "q": city, "lang": "pt"}
 
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = get_session().get(WEATHER_API_URL, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         return data["current"]["temp_c"]
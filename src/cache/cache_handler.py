@@ -1,90 +1,87 @@
-import csv
 import os
-from datetime import datetime, timedelta
-from typing import Callable, Dict, Optional, Tuple
+import threading
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
 
-CACHE_EXPIRATION_HOURS = 10
-DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+from cache.tiered_cache import CACHE_EXPIRATION_HOURS, MAX_STALENESS_HOURS
+from cache.tiered_cache import NEGATIVE_TTL_HOURS as NEGATIVE_CACHE_EXPIRATION_HOURS
+from cache.tiered_cache import TieredCache
 
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
 
-def load_cache(csv_path: str) -> Dict[str, Tuple[str, datetime]]:
+
+def load_cache(cache_path: str) -> TieredCache:
     """
-    Carrega o cache de um arquivo CSV, incluindo o timestamp de cada item.
+    Retorna o cache associado ao arquivo: um LRU em memória (limitado por
+    CACHE_MAX_ENTRIES/CACHE_MAX_BYTES) na frente do arquivo, que não é
+    carregado por inteiro, apenas consultado chave a chave. Arquivos
+    .db/.sqlite/.sqlite3 usam SQLite; os demais, um log CSV. A mesma
+    instância é reaproveitada para o mesmo caminho.
 
     Args:
-        csv_path (str): Caminho do arquivo de cache.
+        cache_path (str): Caminho do arquivo de cache.
 
     Returns:
-        Dict[str, Tuple[str, datetime]]: Dicionário com chave, resultado e horário.
-    """
-    cache: Dict[str, Tuple[str, datetime]] = {}
-    if os.path.exists(csv_path):
-        with open(csv_path, mode="r", newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                timestamp = datetime.strptime(row["timestamp"], DATETIME_FORMAT)
-                cache[row["key"]] = (row["result"], timestamp)
-    return cache
-
-
-def save_cache(csv_path: str, cache: Dict[str, Tuple[str, datetime]]) -> None:
+        TieredCache: Cache do arquivo.
     """
-    Salva o cache em um arquivo CSV com timestamp.
-
-    Args:
-        csv_path (str): Caminho do arquivo CSV.
-        cache (Dict[str, Tuple[str, datetime]]): Cache com resultado e horário.
-    """
-    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-    with open(csv_path, mode="w", newline="", encoding="utf-8") as file:
-        fieldnames = ["key", "result", "timestamp"]
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        for key, (result, timestamp) in cache.items():
-            writer.writerow(
-                {
-                    "key": key,
-                    "result": result,
-                    "timestamp": timestamp.strftime(DATETIME_FORMAT),
-                }
+    full_path = os.path.abspath(cache_path)
+    with _caches_lock:
+        cache = _caches.get(full_path)
+        if cache is None:
+            cache = TieredCache(
+                storage_path=cache_path,
+                default_ttl_hours=CACHE_EXPIRATION_HOURS,
+                negative_ttl_hours=NEGATIVE_CACHE_EXPIRATION_HOURS,
+                verbose=True,
+                metrics_name="csv",
             )
+            _caches[full_path] = cache
+        return cache
 
 
 def get_result(
     key: str,
-    cache: Dict[str, Tuple[str, datetime]],
-    fetch_func: Optional[Callable[[], str]] = None,
-) -> Optional[str]:
+    cache: TieredCache,
+    fetch_func: Optional[Callable[[], Any]] = None,
+    ttl: Optional[timedelta] = None,
+    stale_while_revalidate: bool = False,
+    max_staleness: Optional[timedelta] = None,
+) -> Optional[Any]:
     """
     Retorna o resultado do cache se válido, ou usa fetch_func para obter e atualizar o cache.
+    Chamadas concorrentes para a mesma chave ausente compartilham uma única
+    execução de fetch_func. Resultados None são guardados como "falha conhecida"
+    e valem por NEGATIVE_CACHE_EXPIRATION_HOURS; se já havia um valor bom, ele
+    é mantido e devolvido, e a busca só é refeita após esse mesmo prazo. Novos
+    valores são gravados no arquivo imediatamente (write-through).
+
+    Com stale_while_revalidate, uma entrada expirada há menos de max_staleness
+    é devolvida imediatamente e atualizada em segundo plano; além desse limite
+    a chamada aguarda a nova busca.
 
     Args:
         key (str): Chave de identificação do item.
-        cache (Dict[str, Tuple[str, datetime]]): Dicionário do cache atual.
-        fetch_func (Callable[[], str], opcional): Função para buscar o dado real se cache inválido.
+        cache (TieredCache): Cache obtido com load_cache.
+        fetch_func (Callable[[], Any], opcional): Função para buscar o dado real se cache inválido.
+        ttl (timedelta, opcional): Validade da entrada. Padrão é CACHE_EXPIRATION_HOURS.
+        stale_while_revalidate (bool): Devolve valores expirados enquanto atualiza.
+        max_staleness (timedelta, opcional): Tempo máximo após a expiração em que
+            o valor antigo ainda pode ser devolvido. Padrão é MAX_STALENESS_HOURS.
 
     Returns:
-        Optional[str]: Resultado do cache ou do fetch_func.
+        Optional[Any]: Resultado do cache ou do fetch_func.
     """
-    now = datetime.now()
-    if key in cache:
-        result, timestamp = cache[key]
-        if now - timestamp < timedelta(hours=CACHE_EXPIRATION_HOURS):
-            print(f"[CACHE VÁLIDO] Usando cache para '{key}'")
-            return result
-        else:
-            print(f"[CACHE EXPIRADO] Cache expirado para '{key}'")
-
-    if fetch_func:
-        print(f"[CACHE MISS] Buscando dado real para '{key}'")
-        result = fetch_func()
-        cache[key] = (result, now)
-        return result
-
-    print(
-        f"[CACHE MISS SEM FETCH_FUNC] Nenhum dado encontrado e nenhuma função de busca fornecida para '{key}'"
+    if max_staleness is None:
+        max_staleness = timedelta(hours=MAX_STALENESS_HOURS)
+    return cache.get(
+        "",
+        key,
+        fetch_func,
+        ttl=ttl,
+        stale_while_revalidate=stale_while_revalidate,
+        max_staleness=max_staleness,
     )
-    return None
 
 
 if __name__ == "__main__":
@@ -98,5 +95,3 @@ if __name__ == "__main__":
 
         result = get_result(input_key, cache_data, fetch_func=fetch_real)
         print(f"Resultado: {result}")
-
-    save_cache(CSV_PATH, cache_data)
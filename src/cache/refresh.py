@@ -0,0 +1,72 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, Set
+
+REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "4"))
+
+
+class BackgroundRefresher:
+    """
+    Executa atualizações de cache em segundo plano (stale-while-revalidate),
+    com no máximo uma atualização pendente por chave.
+    """
+
+    def __init__(self, max_workers: int = REFRESH_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pending: Set[Hashable] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, key: Hashable, func: Callable[[], Any]) -> bool:
+        """
+        Agenda func para atualizar a chave, caso ainda não haja uma atualização
+        pendente para ela.
+
+        Args:
+            key (Hashable): Chave a ser atualizada.
+            func (Callable[[], Any]): Função que busca e grava o novo valor.
+
+        Returns:
+            bool: True se a atualização foi agendada.
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cache-refresh"
+                )
+            executor = self._executor
+
+        def _run() -> None:
+            try:
+                func()
+            except Exception as e:
+                print(f"[ERRO REVALIDAÇÃO] Falha ao atualizar '{key}': {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        executor.submit(_run)
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Encerra o pool de atualização, aguardando as tarefas pendentes.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_refresher = BackgroundRefresher()
+
+
+def get_refresher() -> BackgroundRefresher:
+    """
+    Retorna o executor de atualizações em segundo plano compartilhado.
+    """
+    return _refresher
@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Garante que chamadas concorrentes para a mesma chave executem a função de
+    busca uma única vez: a primeira thread executa e as demais aguardam e
+    recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Executa func para a chave, ou aguarda a execução já em andamento.
+
+        Args:
+            key (Hashable): Chave que identifica a busca.
+            func (Callable[[], Any]): Função de busca.
+
+        Returns:
+            Any: Resultado compartilhado da função.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = Future()
+                self._calls[key] = call
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """
+        Retorna quantas buscas estão em andamento.
+        """
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,286 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+FIELDNAMES = ["key", "result", "timestamp"]
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+COMPACTION_MIN_ROWS = 1000
+COMPACTION_RATIO = 2
+
+CacheEntry = Tuple[Any, datetime]
+
+
+def _json_default(value: Any) -> Any:
+    # Escalares do numpy/pandas (ex.: numpy.int64) expõem .item()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _serialize(result: Any) -> str:
+    return json.dumps(result, ensure_ascii=False, default=_json_default)
+
+
+def _deserialize(value: Optional[str]) -> Any:
+    """
+    Converte o valor gravado de volta ao tipo original. Valores vazios (formato
+    antigo de falhas) viram None e textos que não são JSON são mantidos como
+    string.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def _format_csv_row(row: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue().encode("utf-8")
+
+
+class CacheStorage(ABC):
+    """
+    Interface dos armazenamentos persistentes do cache. Cada implementação
+    grava entradas de forma incremental (custo O(1) por entrada) e permite
+    carregar tudo ou consultar uma única chave. Os resultados são gravados em
+    JSON, preservando o tipo (int, float, dict, None...).
+    """
+
+    @abstractmethod
+    def load(self) -> Dict[str, CacheEntry]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_many(self, entries: Iterable[Tuple[str, object, datetime]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class CsvLogStorage(CacheStorage):
+    """
+    Armazenamento em CSV no formato key,result,timestamp usado como log somente
+    de acréscimo: cada gravação adiciona linhas ao final do arquivo e, ao ler,
+    a última linha de cada chave prevalece. Quando o arquivo acumula linhas
+    obsoletas demais ele é compactado.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._offsets: Optional[Dict[str, int]] = None
+
+    def _read_rows(self) -> Iterable[Tuple[int, dict]]:
+        with open(self.path, mode="rb") as file:
+            header = file.readline()
+            offset = len(header)
+            for raw_line in file:
+                line = raw_line.decode("utf-8")
+                row = next(csv.reader([line]), None)
+                if row and len(row) == len(FIELDNAMES):
+                    yield offset, dict(zip(FIELDNAMES, row))
+                offset += len(raw_line)
+
+    def load(self) -> Dict[str, CacheEntry]:
+        cache: Dict[str, CacheEntry] = {}
+        if not os.path.exists(self.path):
+            self._offsets, self._rows = {}, 0
+            return cache
+
+        offsets: Dict[str, int] = {}
+        rows = 0
+        with self._lock:
+            for offset, row in self._read_rows():
+                rows += 1
+                offsets[row["key"]] = offset
+                cache[row["key"]] = (
+                    _deserialize(row["result"]),
+                    _parse_timestamp(row["timestamp"]),
+                )
+            self._rows = rows
+            self._offsets = offsets
+        return cache
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        if self._offsets is None:
+            self.load()
+        offset = self._offsets.get(key)
+        if offset is None:
+            return None
+
+        with self._lock, open(self.path, mode="rb") as file:
+            file.seek(offset)
+            line = file.readline().decode("utf-8")
+        row = dict(zip(FIELDNAMES, next(csv.reader([line]))))
+        return _deserialize(row["result"]), _parse_timestamp(row["timestamp"])
+
+    def _build_index(self) -> None:
+        self._offsets, self._rows = {}, 0
+        if not os.path.exists(self.path):
+            return
+        for offset, row in self._read_rows():
+            self._offsets[row["key"]] = offset
+            self._rows += 1
+
+    def put_many(self, entries: Iterable[Tuple[str, object, datetime]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            if self._offsets is None:
+                self._build_index()
+
+            with open(self.path, mode="ab") as file:
+                if file.tell() == 0:
+                    file.write(_format_csv_row(FIELDNAMES))
+                for key, result, timestamp in entries:
+                    self._offsets[key] = file.tell()
+                    file.write(
+                        _format_csv_row(
+                            [
+                                key,
+                                _serialize(result),
+                                timestamp.strftime(DATETIME_FORMAT),
+                            ]
+                        )
+                    )
+                    self._rows += 1
+
+            if self._rows > max(
+                COMPACTION_MIN_ROWS, COMPACTION_RATIO * len(self._offsets)
+            ):
+                self._compact()
+
+    def _compact(self) -> None:
+        """
+        Reescreve o arquivo mantendo apenas a última linha de cada chave.
+        Deve ser chamado com o lock adquirido.
+        """
+        latest: Dict[str, dict] = {}
+        for _, row in self._read_rows():
+            latest[row["key"]] = row
+
+        tmp_path = f"{self.path}.tmp"
+        offsets: Dict[str, int] = {}
+        with open(tmp_path, mode="wb") as file:
+            file.write(_format_csv_row(FIELDNAMES))
+            for key, row in latest.items():
+                offsets[key] = file.tell()
+                file.write(_format_csv_row([row[field] for field in FIELDNAMES]))
+        os.replace(tmp_path, self.path)
+
+        self._offsets = offsets
+        self._rows = len(offsets)
+
+
+class SqliteStorage(CacheStorage):
+    """
+    Armazenamento em SQLite com a chave como PRIMARY KEY (indexada), permitindo
+    upsert e consulta pontual sem ler o arquivo inteiro.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, result TEXT, timestamp TEXT NOT NULL)"
+            )
+
+    def load(self) -> Dict[str, CacheEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, result, timestamp FROM cache"
+            ).fetchall()
+        return {
+            key: (_deserialize(result), _parse_timestamp(ts))
+            for key, result, ts in rows
+        }
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, timestamp FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return _deserialize(row[0]), _parse_timestamp(row[1])
+
+    def put_many(self, entries: Iterable[Tuple[str, object, datetime]]) -> None:
+        rows = [
+            (key, _serialize(result), timestamp.strftime(DATETIME_FORMAT))
+            for key, result, timestamp in entries
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO cache (key, result, timestamp) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "result = excluded.result, timestamp = excluded.timestamp",
+                rows,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_storages: Dict[str, CacheStorage] = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(path: str) -> CacheStorage:
+    """
+    Retorna o armazenamento associado ao caminho, escolhido pela extensão do
+    arquivo: .db/.sqlite/.sqlite3 usam SQLite e os demais o log em CSV.
+    A mesma instância é reaproveitada para o mesmo caminho.
+
+    Args:
+        path (str): Caminho do arquivo de cache.
+
+    Returns:
+        CacheStorage: Armazenamento persistente do cache.
+    """
+    full_path = os.path.abspath(path)
+    with _storages_lock:
+        storage = _storages.get(full_path)
+        if storage is None:
+            if path.lower().endswith(SQLITE_EXTENSIONS):
+                storage = SqliteStorage(path)
+            else:
+                storage = CsvLogStorage(path)
+            _storages[full_path] = storage
+        return storage
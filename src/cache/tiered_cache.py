@@ -0,0 +1,345 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cache.refresh import get_refresher
+from cache.single_flight import SingleFlight
+from cache.storage import CacheStorage, get_storage
+from instrumentation.metrics import record_cache
+
+NAMESPACE_TTL_HOURS: Dict[str, float] = {
+    "weather": 1,
+    "aqi": 3,
+    "country": 24 * 30,
+}
+CACHE_EXPIRATION_HOURS = 10
+NEGATIVE_TTL_HOURS = 1
+MAX_STALENESS_HOURS = 24
+MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", "0")) or None
+
+MemoryEntry = Tuple[Any, datetime, int]
+
+
+def _estimate_size(key: Tuple[str, str], result: Any) -> int:
+    return sys.getsizeof(key[0]) + sys.getsizeof(key[1]) + sys.getsizeof(result)
+
+
+class TieredCache:
+    """
+    Cache em dois níveis: um LRU em memória limitado por número de entradas
+    e/ou bytes, com TTL por namespace (ex.: 'weather' expira antes de
+    'country'), apoiado por um armazenamento persistente opcional.
+
+    Leituras consultam a memória e, em caso de falta, o armazenamento; as
+    gravações vão para os dois níveis (write-through). Resultados None são
+    falhas conhecidas e usam um TTL menor (negative caching). Uma falha não
+    substitui um valor anterior já em cache: o valor anterior é devolvido e a
+    busca só é tentada de novo depois do TTL negativo.
+
+    Com stale_while_revalidate, entradas expiradas há menos de
+    max_staleness_hours são devolvidas imediatamente e atualizadas em segundo
+    plano.
+
+    No namespace vazio ('') as chaves são gravadas no armazenamento sem
+    prefixo, como nos arquivos de cache de cache_handler. Com verbose, cada
+    consulta é registrada na saída ([CACHE VÁLIDO], [CACHE MISS]...).
+    """
+
+    def __init__(
+        self,
+        storage_path: Optional[str] = None,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: Optional[int] = MAX_BYTES,
+        ttl_hours: Optional[Dict[str, float]] = None,
+        default_ttl_hours: float = CACHE_EXPIRATION_HOURS,
+        negative_ttl_hours: float = NEGATIVE_TTL_HOURS,
+        stale_while_revalidate: bool = False,
+        max_staleness_hours: float = MAX_STALENESS_HOURS,
+        verbose: bool = False,
+        metrics_name: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_hours = {**NAMESPACE_TTL_HOURS, **(ttl_hours or {})}
+        self.default_ttl_hours = default_ttl_hours
+        self.negative_ttl_hours = negative_ttl_hours
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_staleness = timedelta(hours=max_staleness_hours)
+        self.verbose = verbose
+        self.metrics_name = metrics_name
+        self.storage: Optional[CacheStorage] = (
+            get_storage(storage_path) if storage_path else None
+        )
+        self._entries: "OrderedDict[Tuple[str, str], MemoryEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._single_flight = SingleFlight()
+        # Horário da última falha de chaves que mantêm um valor bom anterior
+        self._failures: Dict[Tuple[str, str], datetime] = {}
+
+    def ttl(
+        self, namespace: str, result: Any = True, ttl: Optional[timedelta] = None
+    ) -> timedelta:
+        """
+        Retorna o tempo de expiração do namespace (ou ttl, se informado), ou o
+        TTL negativo quando o resultado é None (falha conhecida).
+        """
+        if ttl is None:
+            ttl = timedelta(hours=self.ttl_hours.get(namespace, self.default_ttl_hours))
+        if result is None:
+            return min(ttl, timedelta(hours=self.negative_ttl_hours))
+        return ttl
+
+    @staticmethod
+    def _storage_key(namespace: str, key: str) -> str:
+        return f"{namespace}:{key}" if namespace else key
+
+    def _record(
+        self, namespace: str, status: str, message: Optional[str] = None
+    ) -> None:
+        record_cache(self.metrics_name or f"tiered:{namespace}", status)
+        if self.verbose and message:
+            print(message)
+
+    def _get_memory(self, memory_key: Tuple[str, str]) -> Optional[MemoryEntry]:
+        with self._lock:
+            entry = self._entries.get(memory_key)
+            if entry is not None:
+                self._entries.move_to_end(memory_key)
+            return entry
+
+    def _set_memory(
+        self, memory_key: Tuple[str, str], result: Any, timestamp: datetime
+    ) -> None:
+        size = _estimate_size(memory_key, result)
+        with self._lock:
+            previous = self._entries.pop(memory_key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[memory_key] = (result, timestamp, size)
+            self._bytes += size
+            self._enforce_limits()
+
+    def _enforce_limits(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def get(
+        self,
+        namespace: str,
+        key: str,
+        fetch_func: Optional[Callable[[], Any]] = None,
+        ttl: Optional[timedelta] = None,
+        stale_while_revalidate: Optional[bool] = None,
+        max_staleness: Optional[timedelta] = None,
+    ) -> Optional[Any]:
+        """
+        Retorna o valor válido do cache (memória ou armazenamento) ou usa
+        fetch_func para obtê-lo e atualizar os dois níveis. Faltas concorrentes
+        na mesma chave compartilham uma única execução de fetch_func.
+
+        Args:
+            namespace (str): Namespace da chave (define o TTL).
+            key (str): Chave de identificação do item.
+            fetch_func (Callable[[], Any], opcional): Função para buscar o dado
+                real se o cache estiver ausente ou expirado.
+            ttl (timedelta, opcional): Validade da entrada nesta consulta.
+                Padrão é o TTL do namespace.
+            stale_while_revalidate (bool, opcional): Substitui a configuração
+                do cache nesta consulta.
+            max_staleness (timedelta, opcional): Substitui max_staleness_hours
+                nesta consulta.
+
+        Returns:
+            Optional[Any]: Resultado do cache ou do fetch_func.
+        """
+        if stale_while_revalidate is None:
+            stale_while_revalidate = self.stale_while_revalidate
+        if max_staleness is None:
+            max_staleness = self.max_staleness
+
+        entry = self._find(namespace, key)
+        if entry is not None:
+            result, timestamp = entry
+            age = datetime.now() - timestamp
+            entry_ttl = self.ttl(namespace, result, ttl)
+            if age < entry_ttl:
+                if result is None:
+                    self._record(
+                        namespace,
+                        "negative",
+                        f"[CACHE NEGATIVO] Falha conhecida em cache para '{key}'",
+                    )
+                else:
+                    self._record(
+                        namespace, "hit", f"[CACHE VÁLIDO] Usando cache para '{key}'"
+                    )
+                return result
+            if self._recent_failure(namespace, key, ttl):
+                self._record(
+                    namespace,
+                    "stale",
+                    f"[CACHE FALHA RECENTE] Usando o último valor de '{key}'",
+                )
+                return result
+            if (
+                stale_while_revalidate
+                and fetch_func is not None
+                and age < entry_ttl + max_staleness
+            ):
+                self._record(
+                    namespace,
+                    "stale",
+                    f"[CACHE DESATUALIZADO] Usando cache e atualizando '{key}'",
+                )
+                get_refresher().submit(
+                    (id(self), namespace, key),
+                    lambda: self._fetch_and_store(namespace, key, fetch_func, ttl),
+                )
+                return result
+            self._record(
+                namespace, "expired", f"[CACHE EXPIRADO] Cache expirado para '{key}'"
+            )
+        else:
+            self._record(namespace, "miss")
+
+        if fetch_func is None:
+            if self.verbose:
+                print(
+                    f"[CACHE MISS SEM FETCH_FUNC] Nenhum dado encontrado e nenhuma função de busca fornecida para '{key}'"
+                )
+            return None
+
+        return self._fetch_and_store(namespace, key, fetch_func, ttl)
+
+    def _recent_failure(
+        self, namespace: str, key: str, ttl: Optional[timedelta] = None
+    ) -> bool:
+        with self._lock:
+            failed_at = self._failures.get((namespace, key))
+        return failed_at is not None and datetime.now() - failed_at < self.ttl(
+            namespace, None, ttl
+        )
+
+    def _fetch_and_store(
+        self,
+        namespace: str,
+        key: str,
+        fetch_func: Callable[[], Any],
+        ttl: Optional[timedelta] = None,
+    ) -> Any:
+        def _fetch() -> Any:
+            # Outra thread pode ter preenchido o cache enquanto esta aguardava
+            entry = self._find(namespace, key)
+            if entry is not None and (
+                datetime.now() - entry[1] < self.ttl(namespace, entry[0], ttl)
+                or self._recent_failure(namespace, key, ttl)
+            ):
+                return entry[0]
+            if self.verbose:
+                print(f"[CACHE MISS] Buscando dado real para '{key}'")
+            now = datetime.now()
+            result = fetch_func()
+            if result is None and entry is not None and entry[0] is not None:
+                # Uma falha não substitui o último valor bom: devolve o valor
+                # anterior e marca a falha para não repetir a busca antes do
+                # TTL negativo
+                with self._lock:
+                    self._failures[(namespace, key)] = now
+                return entry[0]
+            with self._lock:
+                self._failures.pop((namespace, key), None)
+            self.set(namespace, key, result, now)
+            return result
+
+        return self._single_flight.do((namespace, key), _fetch)
+
+    def _find(self, namespace: str, key: str) -> Optional[Tuple[Any, datetime]]:
+        """
+        Procura a entrada na memória e, se ausente, no armazenamento,
+        promovendo-a para a memória. Não verifica a validade.
+        """
+        memory_key = (namespace, key)
+        entry = self._get_memory(memory_key)
+        if entry is not None:
+            return entry[0], entry[1]
+
+        if self.storage is not None:
+            stored = self.storage.get(self._storage_key(namespace, key))
+            if stored is not None:
+                self._set_memory(memory_key, stored[0], stored[1])
+                return stored
+
+        return None
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        result: Any,
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        """
+        Grava um valor nos dois níveis do cache.
+
+        Args:
+            namespace (str): Namespace da chave.
+            key (str): Chave de identificação do item.
+            result (Any): Valor a ser armazenado.
+            timestamp (datetime, opcional): Horário da obtenção (padrão: agora).
+        """
+        timestamp = timestamp or datetime.now()
+        self._set_memory((namespace, key), result, timestamp)
+        if self.storage is not None:
+            self.storage.put_many(
+                [(self._storage_key(namespace, key), result, timestamp)]
+            )
+
+    def evict(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        """
+        Remove entradas da memória: uma chave específica, um namespace inteiro
+        ou tudo (sem argumentos). O armazenamento persistente não é alterado.
+
+        Args:
+            namespace (str, opcional): Namespace a remover.
+            key (str, opcional): Chave a remover dentro do namespace.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        with self._lock:
+            if namespace is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return removed
+
+            if key is not None:
+                memory_keys = (
+                    [(namespace, key)] if (namespace, key) in self._entries else []
+                )
+            else:
+                memory_keys = [k for k in self._entries if k[0] == namespace]
+
+            for memory_key in memory_keys:
+                _, _, size = self._entries.pop(memory_key)
+                self._bytes -= size
+            return len(memory_keys)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna o tamanho atual do nível em memória.
+
+        Returns:
+            Dict[str, int]: Número de entradas e bytes estimados.
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
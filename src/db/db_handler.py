@@ -1,25 +1,103 @@
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
 
 import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
 
+from db import query_cache
+from db.sql_registry import get_query
+from instrumentation.metrics import get_registry, instrumented, record_cache
 
-def get_engine() -> Engine:
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
+POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def database_url() -> str:
     """
-    Cria e retorna uma engine de conexão com o banco de dados PostgreSQL,
-    utilizando variáveis de ambiente.
+    Monta a URL de conexão com o PostgreSQL a partir das variáveis de ambiente.
 
     Returns:
-        Engine: engine do SQLAlchemy para conexão com o banco.
+        str: URL de conexão do SQLAlchemy.
     """
     user = os.getenv("PG_USER")
     password = os.getenv("PG_PASSWORD")
     host = os.getenv("PG_HOST")
     db_name = os.getenv("PG_DB")
 
-    return create_engine(f"postgresql://{user}:{password}@{host}/{db_name}")
+    return f"postgresql://{user}:{password}@{host}/{db_name}"
+
+
+def create_pooled_engine(
+    url: str,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = MAX_OVERFLOW,
+    pool_pre_ping: bool = POOL_PRE_PING,
+    pool_recycle: int = POOL_RECYCLE_SECONDS,
+) -> Engine:
+    """
+    Cria uma engine com pool de conexões configurável.
+
+    Args:
+        url (str): URL de conexão do SQLAlchemy.
+        pool_size (int): Conexões mantidas abertas no pool.
+        max_overflow (int): Conexões extras permitidas em picos.
+        pool_pre_ping (bool): Testa a conexão antes de reutilizá-la.
+        pool_recycle (int): Segundos até uma conexão ser recriada.
+
+    Returns:
+        Engine: engine do SQLAlchemy.
+    """
+    return create_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_recycle=pool_recycle,
+    )
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """
+    Retorna a engine de conexão com o banco de dados PostgreSQL, utilizando
+    variáveis de ambiente. A engine (e seu pool de conexões) é criada uma única
+    vez por URL e compartilhada pelo processo.
+
+    Args:
+        url (str, opcional): URL de conexão. Padrão é a URL montada a partir
+            das variáveis PG_*.
+
+    Returns:
+        Engine: engine do SQLAlchemy para conexão com o banco.
+    """
+    url = url or database_url()
+    engine = _engines.get(url)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(url)
+            if engine is None:
+                engine = create_pooled_engine(url)
+                _engines[url] = engine
+    return engine
+
+
+def dispose_engines() -> None:
+    """
+    Fecha as conexões de todas as engines compartilhadas e as descarta; a
+    próxima chamada a get_engine cria um pool novo.
+    """
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
 
 
 def read_sql_file(file_path: str) -> str:
@@ -36,26 +114,86 @@ def read_sql_file(file_path: str) -> str:
         return file.read()
 
 
-def run_query_from_file(file_path: str, limit: Optional[int] = None) -> pd.DataFrame:
+def _build_query(
+    file_path: str,
+    limit: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[TextClause, Dict[str, Any]]:
+    query = get_query(file_path)
+    bind_params = dict(params or {})
+
+    if limit is None:
+        return query.clause, bind_params
+
+    bind_params["limit"] = int(limit)
+    return query.limited_clause, bind_params
+
+
+def _read_sql(
+    query: TextClause, engine: Engine, bind_params: Dict[str, Any], name: str
+) -> pd.DataFrame:
+    metrics = get_registry()
+    with metrics.timer(
+        "db_query_duration_seconds", help="Tempo de execução no banco", query=name
+    ):
+        df = pd.read_sql(query, engine, params=bind_params)
+    metrics.inc("db_rows_total", len(df), help="Linhas lidas do banco", query=name)
+    return df
+
+
+@instrumented("db.run_query_from_file")
+def run_query_from_file(
+    file_path: str,
+    limit: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+    use_cache: bool = query_cache.QUERY_CACHE_ENABLED,
+) -> pd.DataFrame:
     """
     Executa uma query SQL a partir de um arquivo e retorna os resultados como DataFrame.
 
+    A query pode ser informada pelo nome (ex.: 'ex_01_clientes_mais_10_trasacoes')
+    ou pelo caminho do arquivo; as queries de src/db/sql são lidas uma única vez
+    (ver db.sql_registry).
+
+    Os valores de params são enviados como parâmetros nomeados (:nome) para o
+    PostgreSQL, nunca concatenados ao SQL; listas viram arrays, o que permite
+    filtros como `city.city = ANY(:cities)`.
+
+    Com use_cache, o resultado é guardado em Parquet (ver db.query_cache) sob
+    uma chave formada pelo SQL, pelos parâmetros e pela versão atual dos
+    dados; execuções repetidas leem do disco enquanto os dados não mudarem e
+    o TTL não expirar.
+
     Args:
-        file_path (str): Caminho para o arquivo .sql contendo a query.
+        file_path (str): Nome da query ou caminho para o arquivo .sql.
         limit (Optional[int], optional): Limite de linhas a serem retornadas. Padrão é None.
+        params (Optional[Dict[str, Any]], optional): Parâmetros nomeados da query. Padrão é None.
+        use_cache (bool, optional): Usa o cache de resultados. Padrão é QUERY_CACHE_ENABLED.
 
     Returns:
         pd.DataFrame: Resultado da query em formato DataFrame.
     """
-    base_query = read_sql_file(file_path).strip().rstrip(";")
+    query, bind_params = _build_query(file_path, limit, params)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    engine = get_engine()
+    if not use_cache:
+        return _read_sql(query, engine, bind_params, name)
 
-    if limit is not None:
-        base_query += f" LIMIT {limit}"
+    data_version = query_cache.get_data_version(engine)
+    if data_version is None:
+        return _read_sql(query, engine, bind_params, name)
 
-    base_query += ";"
+    key = query_cache.cache_key(query.text, bind_params, data_version)
+    df = query_cache.load_result(key)
+    if df is not None:
+        record_cache("query", "hit")
+        print(f"[CACHE QUERY] {os.path.basename(file_path)}")
+        return df
 
-    engine = get_engine()
-    return pd.read_sql(base_query, engine)
+    record_cache("query", "miss")
+    df = _read_sql(query, engine, bind_params, name)
+    query_cache.store_result(key, df)
+    return df
 
 
 # Exemplo de uso
@@ -64,8 +202,6 @@ if __name__ == "__main__":
 
     load_dotenv()
 
-    sql_path = "src/db/sql/ex_01_clientes_mais_10_trasacoes.sql"
-
-    df = run_query_from_file(sql_path, limit=2)
+    df = run_query_from_file("ex_01_clientes_mais_10_trasacoes", limit=2)
 
     print(df.head())
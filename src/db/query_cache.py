@@ -0,0 +1,177 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+QUERY_CACHE_DIR = os.getenv("QUERY_CACHE_DIR", "data/cache/queries")
+QUERY_CACHE_TTL_HOURS = float(os.getenv("QUERY_CACHE_TTL_HOURS", "24"))
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+DATA_VERSION_TTL_SECONDS = 60
+
+# Sonda barata de versão dos dados: qualquer aluguel, pagamento ou cadastro
+# novo altera o resultado e, com ele, as chaves do cache.
+DATA_VERSION_SQL = """
+SELECT
+    (SELECT max(last_update) FROM rental) AS rental,
+    (SELECT max(payment_date) FROM payment) AS payment,
+    (SELECT max(last_update) FROM customer) AS customer,
+    (SELECT max(last_update) FROM address) AS address
+"""
+
+_data_versions: Dict[str, tuple] = {}
+_data_versions_lock = threading.Lock()
+
+
+def get_data_version(engine: Engine, refresh: bool = False) -> Optional[str]:
+    """
+    Retorna a versão atual dos dados do banco, consultada no máximo uma vez a
+    cada DATA_VERSION_TTL_SECONDS por engine.
+
+    Args:
+        engine (Engine): Engine do banco consultado.
+        refresh (bool): Ignora o valor memorizado e consulta novamente.
+
+    Returns:
+        str | None: Versão dos dados, ou None se a sonda falhar.
+    """
+    url = str(engine.url)
+    now = time.monotonic()
+    with _data_versions_lock:
+        cached = _data_versions.get(url)
+        if (
+            cached is not None
+            and not refresh
+            and now - cached[1] < DATA_VERSION_TTL_SECONDS
+        ):
+            return cached[0]
+
+    try:
+        with engine.connect() as connection:
+            row = connection.execute(text(DATA_VERSION_SQL)).one()
+    except Exception as e:
+        print(f"[CACHE QUERY] Não foi possível obter a versão dos dados: {e}")
+        return None
+
+    version = "|".join(str(value) for value in row)
+    with _data_versions_lock:
+        _data_versions[url] = (version, now)
+    return version
+
+
+def cache_key(query_text: str, params: Dict[str, Any], data_version: str) -> str:
+    """
+    Gera a chave do resultado a partir do texto SQL, dos parâmetros e da
+    versão dos dados.
+
+    Args:
+        query_text (str): SQL da query.
+        params (Dict[str, Any]): Parâmetros nomeados.
+        data_version (str): Versão dos dados (ver get_data_version).
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal.
+    """
+    payload = json.dumps(
+        [query_text, params, data_version], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+
+def load_result(
+    key: str,
+    ttl_hours: float = QUERY_CACHE_TTL_HOURS,
+    cache_dir: str = QUERY_CACHE_DIR,
+) -> Optional[pd.DataFrame]:
+    """
+    Lê o resultado em cache, se existir e estiver dentro do TTL.
+
+    Args:
+        key (str): Chave gerada por cache_key.
+        ttl_hours (float): Idade máxima do arquivo em horas.
+        cache_dir (str): Diretório dos arquivos Parquet.
+
+    Returns:
+        pd.DataFrame | None: Resultado em cache ou None.
+    """
+    path = _cache_path(key, cache_dir)
+    try:
+        modified_at = datetime.fromtimestamp(os.path.getmtime(path))
+    except OSError:
+        return None
+
+    if datetime.now() - modified_at >= timedelta(hours=ttl_hours):
+        return None
+
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"[CACHE QUERY] Arquivo ilegível, ignorando {path}: {e}")
+        return None
+
+
+def store_result(key: str, df: pd.DataFrame, cache_dir: str = QUERY_CACHE_DIR) -> None:
+    """
+    Grava o resultado em Parquet de forma atômica (arquivo temporário seguido
+    de rename). Falhas de gravação apenas desativam o cache desta query.
+
+    Args:
+        key (str): Chave gerada por cache_key.
+        df (pd.DataFrame): Resultado da query.
+        cache_dir (str): Diretório dos arquivos Parquet.
+    """
+    path = _cache_path(key, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[CACHE QUERY] Não foi possível gravar o resultado: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def invalidate(key: Optional[str] = None, cache_dir: str = QUERY_CACHE_DIR) -> int:
+    """
+    Remove um resultado do cache, ou todos quando key é None. Também descarta
+    as versões de dados memorizadas.
+
+    Args:
+        key (str, opcional): Chave a remover.
+        cache_dir (str): Diretório dos arquivos Parquet.
+
+    Returns:
+        int: Quantidade de arquivos removidos.
+    """
+    with _data_versions_lock:
+        _data_versions.clear()
+
+    paths = (
+        [_cache_path(key, cache_dir)]
+        if key is not None
+        else glob.glob(os.path.join(cache_dir, "*.parquet"))
+    )
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
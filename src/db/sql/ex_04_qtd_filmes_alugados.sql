@@ -15,6 +15,8 @@ JOIN address ON
 	customer.address_id = address.address_id
 JOIN city ON
 	address.city_id = city.city_id
+WHERE
+	city.city = ANY(:cities)
 GROUP BY
 	city.city,
 	film.film_id,
@@ -1,6 +1,7 @@
 --Tempo medio de aluguel por cidade dias
 SELECT
     c2.city,
+    c3.country,
     AVG(EXTRACT(EPOCH FROM (r.return_date - r.rental_date)) / 86400) AS tempo_medio_aluguel_dias
 FROM
     rental r
@@ -10,7 +11,10 @@ JOIN
     address a ON a.address_id = c.address_id
 JOIN
     city c2 ON c2.city_id = a.city_id
+JOIN
+    country c3 ON c3.country_id = c2.country_id
 GROUP BY
-    c2.city
+    c2.city,
+    c3.country
 ORDER BY
     tempo_medio_aluguel_dias DESC
\ No newline at end of file
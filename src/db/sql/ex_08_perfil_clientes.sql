@@ -4,6 +4,9 @@ SELECT
 	city.city AS cidade,
 	address.district AS estado,
 	country.country AS pais,
+	-- Idade fictícia (o Pagila não tem data de nascimento): 18 a 70 anos, fixa por cliente
+	18 + (customer.customer_id * 37) % 53 AS idade,
+	COUNT(DISTINCT rental.rental_id) AS total_alugueis,
 	COALESCE(SUM(payment.amount), 0) AS gasto_total
 FROM
 	customer
@@ -0,0 +1,135 @@
+import glob
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+
+
+@dataclass(frozen=True)
+class SqlQuery:
+    """
+    Query SQL já lida do disco e compilada em objetos text() do SQLAlchemy,
+    com e sem o LIMIT parametrizado.
+    """
+
+    name: str
+    path: str
+    sql: str
+    clause: TextClause
+    limited_clause: TextClause
+    bind_params: Tuple[str, ...]
+
+    @classmethod
+    def from_file(cls, path: str) -> "SqlQuery":
+        """
+        Lê e compila um arquivo .sql.
+
+        Args:
+            path (str): Caminho do arquivo.
+
+        Returns:
+            SqlQuery: Query compilada.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            sql = file.read().strip().rstrip(";")
+
+        clause = text(sql)
+        # Em nova linha para não ser engolido por um comentário no fim do arquivo
+        limited_clause = text(f"{sql}\nLIMIT :limit")
+        return cls(
+            name=os.path.splitext(os.path.basename(path))[0],
+            path=os.path.abspath(path),
+            sql=sql,
+            clause=clause,
+            limited_clause=limited_clause,
+            bind_params=tuple(clause.compile().params),
+        )
+
+
+class SqlRegistry:
+    """
+    Registro das queries de um diretório, carregadas uma única vez e
+    acessíveis pelo nome do arquivo sem extensão (ex.:
+    'ex_01_clientes_mais_10_trasacoes'), independentemente do diretório de
+    trabalho atual.
+
+    Caminhos para arquivos fora do diretório também são aceitos; eles são
+    lidos na primeira chamada e mantidos em cache.
+    """
+
+    def __init__(self, sql_dir: str = SQL_DIR):
+        self.sql_dir = os.path.abspath(sql_dir)
+        self._lock = threading.Lock()
+        self._queries: Dict[str, SqlQuery] = {}
+        self._extra: Dict[str, SqlQuery] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Relê todos os arquivos .sql do diretório e descarta o cache.
+        """
+        queries = {}
+        for path in sorted(glob.glob(os.path.join(self.sql_dir, "*.sql"))):
+            query = SqlQuery.from_file(path)
+            queries[query.name] = query
+        with self._lock:
+            self._queries = queries
+            self._extra = {}
+
+    def names(self) -> List[str]:
+        """
+        Retorna os nomes das queries registradas.
+        """
+        return sorted(self._queries)
+
+    def get(self, name_or_path: str) -> SqlQuery:
+        """
+        Retorna a query pelo nome, pelo nome do arquivo ou por um caminho
+        (os caminhos antigos 'src/db/sql/....sql' continuam válidos de
+        qualquer diretório).
+
+        Args:
+            name_or_path (str): Nome da query ou caminho do arquivo .sql.
+
+        Returns:
+            SqlQuery: Query compilada.
+
+        Raises:
+            KeyError: Se a query não existir.
+        """
+        path = os.path.abspath(name_or_path)
+        if os.path.isfile(path) and os.path.dirname(path) != self.sql_dir:
+            with self._lock:
+                query = self._extra.get(path)
+                if query is None:
+                    query = SqlQuery.from_file(path)
+                    self._extra[path] = query
+            return query
+
+        name = os.path.splitext(os.path.basename(name_or_path))[0]
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise KeyError(f"Query SQL não encontrada: {name_or_path}") from None
+
+
+_registry = SqlRegistry()
+
+
+def get_registry() -> SqlRegistry:
+    """
+    Retorna o registro de queries de src/db/sql.
+    """
+    return _registry
+
+
+def get_query(name_or_path: str) -> SqlQuery:
+    """
+    Atalho para get_registry().get(name_or_path).
+    """
+    return _registry.get(name_or_path)
@@ -6,6 +6,7 @@
 
 import os
 import sys
+from typing import Optional
 
 import pandas as pd
 
@@ -16,28 +17,31 @@ sys.path.insert(
 
 QUERY_LIMIT = 10
 
-from api.weather_api import get_temperature
+from api.enrichment import EnrichmentLookup, enrich_temperatures
 from db.db_handler import run_query_from_file
 
 
 def cidades_clientes_mais_10_trasacoes():
-    sql_path = "src/db/sql/ex_01_clientes_mais_10_trasacoes.sql"
-    df_cidades_clientes_mais_10_trasacoes = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_01_clientes_mais_10_trasacoes"
+    df_cidades_clientes_mais_10_trasacoes = run_query_from_file(query_name, QUERY_LIMIT)
     return df_cidades_clientes_mais_10_trasacoes
 
 
-def temperatura_cidade(df: pd.DataFrame) -> pd.DataFrame:
+def temperatura_cidade(
+    df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
     """
     Adiciona a temperatura atual em Celsius a cada cidade do DataFrame.
 
     Args:
         df (pd.DataFrame): DataFrame contendo uma coluna 'city'.
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada; apenas as cidades ausentes são consultadas na API.
 
     Returns:
         pd.DataFrame: DataFrame com coluna 'temperatura_c' adicionada.
     """
-    df["temperatura_c"] = df["city"].apply(lambda cidade: get_temperature(cidade))
-    return df
+    return enrich_temperatures(df, column="city", target="temperatura_c", lookup=tabela)
 
 
 def calcular_temperatura_media_ponderada(df: pd.DataFrame) -> float:
@@ -53,6 +57,35 @@ def calcular_temperatura_media_ponderada(df: pd.DataFrame) -> float:
     return (df["temperatura_c"] * df["num_clientes"]).sum() / df["num_clientes"].sum()
 
 
+def gera_insights(df_temperatura_cidade: pd.DataFrame) -> None:
+    """
+    Imprime a cidade mais quente, a mais fria e a com mais clientes.
+
+    Args:
+        df_temperatura_cidade (pd.DataFrame): DataFrame com colunas 'city',
+            'temperatura_c' e 'num_clientes'.
+    """
+    cidade_mais_quente = df_temperatura_cidade.sort_values(
+        "temperatura_c", ascending=False
+    ).iloc[0]
+    cidade_mais_fria = df_temperatura_cidade.sort_values("temperatura_c").iloc[0]
+    cidade_mais_clientes = df_temperatura_cidade.sort_values(
+        "num_clientes", ascending=False
+    ).iloc[0]
+    print(
+        f"🔴 Cidade mais quente: {cidade_mais_quente['city']} com {cidade_mais_quente['temperatura_c']} °C "
+        f"e {cidade_mais_quente['num_clientes']} clientes."
+    )
+    print(
+        f"🔵 Cidade mais fria: {cidade_mais_fria['city']} com {cidade_mais_fria['temperatura_c']} °C "
+        f"e {cidade_mais_fria['num_clientes']} clientes."
+    )
+    print(
+        f"👥 Cidade com mais clientes: {cidade_mais_clientes['city']} com {cidade_mais_clientes['num_clientes']} clientes "
+        f"e temperatura de {cidade_mais_clientes['temperatura_c']} °C."
+    )
+
+
 def main():
     print("Recuperar cidades com mais de 10 transações por clientes:")
     df_cidades_mais_clientes_10_transacoes = cidades_clientes_mais_10_trasacoes()
@@ -74,25 +107,7 @@ def main():
     print(
         "Gerar insights sobre as cidades com base na temperatura e número de clientes:"
     )
-    cidade_mais_quente = df_temperatura_cidade.sort_values(
-        "temperatura_c", ascending=False
-    ).iloc[0]
-    cidade_mais_fria = df_temperatura_cidade.sort_values("temperatura_c").iloc[0]
-    cidade_mais_clientes = df_temperatura_cidade.sort_values(
-        "num_clientes", ascending=False
-    ).iloc[0]
-    print(
-        f"🔴 Cidade mais quente: {cidade_mais_quente['city']} com {cidade_mais_quente['temperatura_c']} °C "
-        f"e {cidade_mais_quente['num_clientes']} clientes."
-    )
-    print(
-        f"🔵 Cidade mais fria: {cidade_mais_fria['city']} com {cidade_mais_fria['temperatura_c']} °C "
-        f"e {cidade_mais_fria['num_clientes']} clientes."
-    )
-    print(
-        f"👥 Cidade com mais clientes: {cidade_mais_clientes['city']} com {cidade_mais_clientes['num_clientes']} clientes "
-        f"e temperatura de {cidade_mais_clientes['temperatura_c']} °C."
-    )
+    gera_insights(df_temperatura_cidade)
     print("**********************************************************")
 
 
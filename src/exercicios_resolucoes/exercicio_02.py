@@ -7,6 +7,7 @@
 
 import os
 import sys
+from typing import Optional
 
 import pandas as pd
 
@@ -14,30 +15,33 @@ sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.weather_api import get_temperature
+from api.enrichment import EnrichmentLookup, enrich_temperatures
 from db.db_handler import run_query_from_file
 
 QUERY_LIMIT = 10
 
 
 def receita_bruta_por_cidade() -> pd.DataFrame:
-    sql_path = "src/db/sql/ex_02_receita_bruta_cidade.sql"
-    df_receita_bruta_cidade = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_02_receita_bruta_cidade"
+    df_receita_bruta_cidade = run_query_from_file(query_name, QUERY_LIMIT)
     return df_receita_bruta_cidade
 
 
-def temperatura_media_cidade(df: pd.DataFrame) -> pd.DataFrame:
+def temperatura_media_cidade(
+    df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
     """
     Adiciona a temperatura atual em Celsius a cada cidade do DataFrame.
 
     Args:
         df (pd.DataFrame): DataFrame contendo uma coluna 'city'.
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada; apenas as cidades ausentes são consultadas na API.
 
     Returns:
         pd.DataFrame: DataFrame com coluna 'temperatura_c' adicionada.
     """
-    df["temperatura_c"] = df["city"].apply(lambda cidade: get_temperature(cidade))
-    return df
+    return enrich_temperatures(df, column="city", target="temperatura_c", lookup=tabela)
 
 
 def filtrar_cidades_clima_ameno(df: pd.DataFrame) -> pd.DataFrame:
@@ -13,15 +13,15 @@ sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.countries_api import get_population
+from api.countries_api import get_populations
 from db.db_handler import run_query_from_file
 
 QUERY_LIMIT = 10
 
 
 def paises_mais_alugueis() -> pd.DataFrame:
-    sql_path = "src/db/sql/ex_03_quantidade_alugueis_pais.sql"
-    df_paises_mais_alugueis = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_03_quantidade_alugueis_pais"
+    df_paises_mais_alugueis = run_query_from_file(query_name, QUERY_LIMIT)
     return df_paises_mais_alugueis
 
 
@@ -36,7 +36,7 @@ def obtem_populacao_por_pais(df_paises_mais_alugueis: pd.DataFrame) -> pd.DataFr
         pd.DataFrame: DataFrame com a coluna adicional 'population'.
     """
     df = df_paises_mais_alugueis.copy()
-    df["population"] = df["country"].apply(get_population)
+    df["population"] = df["country"].map(get_populations(df["country"]))
     return df
 
 
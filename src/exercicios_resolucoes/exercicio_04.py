@@ -7,6 +7,7 @@
 
 import os
 import sys
+from typing import Optional
 
 import pandas as pd
 
@@ -14,41 +15,36 @@ sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.airvisual_api import get_aqi
+from api.enrichment import EnrichmentLookup, enrich_aqi
 from db.db_handler import run_query_from_file
 
 QUERY_LIMIT = 10
 
 
 def cidades_mais_clientes() -> pd.DataFrame:
-    sql_path = "src/db/sql/ex_04_qtd_clientes_cidade.sql"
-    df_cidades_mais_clientes = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_04_qtd_clientes_cidade"
+    df_cidades_mais_clientes = run_query_from_file(query_name, QUERY_LIMIT)
     return df_cidades_mais_clientes
 
 
-def obtem_aqi_cidades(cidades_df: pd.DataFrame) -> pd.DataFrame:
+def obtem_aqi_cidades(
+    cidades_df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
     """
     Obtém o AQI das cidades com maior número de clientes, usando a API AirVisual.
 
     Args:
-        cidades_df (pd.DataFrame): DataFrame com as cidades, estados e países.
+        cidades_df (pd.DataFrame): DataFrame com as colunas 'city', 'district'
+            e 'country'.
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada; apenas as cidades ausentes são consultadas na API.
 
     Returns:
         pd.DataFrame: DataFrame com as cidades, país, distrito e AQI.
     """
-    aqi_list = []
-
-    for _, row in cidades_df.iterrows():
-        try:
-            aqi = get_aqi(row["cidade"], row["estado"], row["pais"])
-        except Exception:
-            aqi = None
-        aqi_list.append(aqi)
-
-    cidades_df = cidades_df.copy()
-    cidades_df["aqi"] = aqi_list
-
-    return cidades_df
+    return enrich_aqi(
+        cidades_df, "city", "district", "country", target="aqi", lookup=tabela
+    )
 
 
 def filtra_cidades_alto_aqi(
@@ -85,16 +81,16 @@ def filmes_mais_alugados_nas_cidades(
     Returns:
         pd.DataFrame: DataFrame com os filmes mais alugados nessas cidades.
     """
-    sql_path = "src/db/sql/ex_04_qtd_filmes_alugados.sql"
-    df_filmes_alugados = run_query_from_file(sql_path)
+    query_name = "ex_04_qtd_filmes_alugados"
+    cidades_alto_aqi = cidades_filtradas_df["city"].dropna().unique().tolist()
 
-    # Filtra apenas os filmes cujas cidades estão na lista filtrada
-    cidades_alto_aqi = cidades_filtradas_df["city"].unique()
-    df_filmes_filtrados = df_filmes_alugados[
-        df_filmes_alugados["cidade"].isin(cidades_alto_aqi)
-    ].copy()
+    if not cidades_alto_aqi:
+        return pd.DataFrame(columns=["cidade", "film_id", "title", "total_alugueis"])
 
-    return df_filmes_filtrados.head(QUERY_LIMIT)
+    # O filtro por cidade e o limite são aplicados no PostgreSQL
+    return run_query_from_file(
+        query_name, QUERY_LIMIT, params={"cities": cidades_alto_aqi}
+    )
 
 
 def main():
@@ -6,6 +6,7 @@
 
 import os
 import sys
+from typing import Optional
 
 import pandas as pd
 
@@ -13,10 +14,8 @@ sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.airvisual_api import get_aqi
-from api.weather_api import get_temperature
+from api.enrichment import EnrichmentLookup, enrich_environment
 from db.db_handler import run_query_from_file
-from exercicios_resolucoes.exercicio_04 import obtem_aqi_cidades
 
 QUERY_LIMIT = 10
 
@@ -28,22 +27,25 @@ def clientes_em_areas_criticas() -> pd.DataFrame:
     Returns:
         pd.DataFrame: Dados dos clientes com suas respectivas localizações.
     """
-    sql_path = "src/db/sql/ex_05_clientes_em_areas_criticas.sql"
-    return run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_05_clientes_em_areas_criticas"
+    return run_query_from_file(query_name, QUERY_LIMIT)
 
 
-def combina_nomes_cidades_e_paises(df: pd.DataFrame) -> pd.DataFrame:
+def combina_nomes_cidades_e_paises(
+    df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
     """
     Enriquecer DataFrame com dados de AQI e temperatura.
 
     Args:
         df (pd.DataFrame): DataFrame com colunas ['nome', 'cidade', 'pais']
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada; apenas as cidades ausentes são consultadas na API.
 
     Returns:
         pd.DataFrame: DataFrame com AQI e temperatura incluídos.
     """
-    df = obtem_aqi_cidades(df)
-    return df
+    return enrich_environment(df, "cidade", "estado", "pais", lookup=tabela)
 
 
 def clientes_aqui_acima_de_130(df: pd.DataFrame) -> pd.DataFrame:
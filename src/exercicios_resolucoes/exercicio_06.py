@@ -6,15 +6,17 @@
 import os
 import sys
 
-import matplotlib.pyplot as plt
 import pandas as pd
 
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.countries_api import get_continent
+from api.countries_api import get_continents
 from db.db_handler import run_query_from_file
+from reports.artifacts import fingerprint, is_up_to_date, record_artifact
+from reports.charts import render_pie
+from reports.outputs import write_report_table
 
 QUERY_LIMIT = 10
 
@@ -27,12 +29,12 @@ def mapeia_continente_pais() -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame com as colunas 'country_name', 'amount' e 'continent'.
     """
-    sql_path = "src/db/sql/ex_06_receita_bruta_pais.sql"
-    df_receita_bruta_pais = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_06_receita_bruta_pais"
+    df_receita_bruta_pais = run_query_from_file(query_name, QUERY_LIMIT)
 
     # Adiciona a coluna de continente com base no nome do país
-    df_receita_bruta_pais["continent"] = df_receita_bruta_pais["country_name"].apply(
-        get_continent
+    df_receita_bruta_pais["continent"] = df_receita_bruta_pais["country_name"].map(
+        get_continents(df_receita_bruta_pais["country_name"])
     )
 
     return df_receita_bruta_pais
@@ -86,17 +88,20 @@ def salva_grafico_pizza(df_agregado_continente: pd.DataFrame) -> None:
 
     output_path = os.path.join(output_dir, f"grafico_pizza.png")
 
-    # Criação do gráfico
-    plt.figure(figsize=(8, 8))
-    plt.pie(
-        df["total_amount"], labels=df["continent"], autopct="%1.1f%%", startangle=140
-    )
-    plt.title("Distribuição de Receita por Continente")
-    plt.tight_layout()
+    # Mesmos dados e parâmetros: o gráfico existente continua válido
+    impressao = fingerprint(df, {"grafico": "pizza", "figsize": [8, 8]})
+    if is_up_to_date(output_path, impressao):
+        print(f"[ARTEFATO INALTERADO] Gráfico mantido em: {output_path}")
+        return
 
-    # Salva imagem
-    plt.savefig(output_path)
-    plt.close()
+    # Criação e gravação do gráfico (Figure própria, sem o estado do pyplot)
+    render_pie(
+        output_path,
+        df["total_amount"].tolist(),
+        df["continent"].tolist(),
+        "Distribuição de Receita por Continente",
+    )
+    record_artifact(output_path, impressao)
 
     print(f"Gráfico salvo em: {output_path}")
 
@@ -117,6 +122,11 @@ def main():
     salva_grafico_pizza(df_continente)
     print("***********************************************")
 
+    print("Etapa 4: Exportando receita por continente...")
+    for caminho in write_report_table("receita_continente", df_continente).values():
+        print(f"  {caminho}")
+    print("***********************************************")
+
 
 if __name__ == "__main__":
     main()
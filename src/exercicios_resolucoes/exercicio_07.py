@@ -3,73 +3,144 @@
 # 	•	Combine com a temperatura atual dessas cidades.
 # 	•	Visualize a correlação entre temperatura e tempo médio de aluguel (scatterplot + linha de tendência).
 
+import math
 import os
 import sys
+from typing import Iterable, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
 from scipy.stats import pearsonr
 
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.weather_api import get_temperature
+from api.enrichment import EnrichmentLookup, enrich_temperatures
 from db.db_handler import run_query_from_file
+from reports.artifacts import fingerprint, is_up_to_date, record_artifact
+from reports.charts import ChartJob, render_density, render_many, render_regression
+from reports.excel import iter_chunks
+from reports.stats import Histogram2D, RunningRegression, stratified_sample
 
 QUERY_LIMIT = 10
+TITULO_GRAFICO = "Correlação entre Temperatura e Tempo Médio de Aluguel"
+EIXO_X = "Temperatura Atual (°C)"
+EIXO_Y = "Tempo Médio de Aluguel (dias)"
+COLUNAS_CORRELACAO = ["temperatura_c", "tempo_medio_aluguel_dias"]
+# Acima deste número de pontos, o modo 'auto' usa o gráfico de densidade
+LIMITE_PONTOS_DISPERSAO = int(os.getenv("CORRELATION_SCATTER_MAX_POINTS", "50000"))
+TAMANHO_AMOSTRA = int(os.getenv("CORRELATION_SAMPLE_SIZE", "2000"))
+FAIXAS_DENSIDADE = 60
+DIRETORIO_SEGMENTOS = "data/pics/correlacao_por_pais"
 
 
 def calcula_tempo_medio_por_cidade() -> pd.DataFrame:
-    sql_path = "src/db/sql/ex_07_tempo_medio_aluguel.sql"
-    df_tempo_medio_por_cidade = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_07_tempo_medio_aluguel"
+    df_tempo_medio_por_cidade = run_query_from_file(query_name, QUERY_LIMIT)
     return df_tempo_medio_por_cidade
 
 
-def enriquecer_com_temperatura(df: pd.DataFrame) -> pd.DataFrame:
+def enriquecer_com_temperatura(
+    df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
     """
     Enriquece um DataFrame com a temperatura atual de cada cidade presente na coluna 'city'.
 
     Args:
         df (pd.DataFrame): DataFrame contendo uma coluna chamada 'city'.
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada; apenas as cidades ausentes são consultadas na API.
 
     Returns:
         pd.DataFrame: DataFrame original com a coluna 'temperatura_c' adicionada.
     """
-
-    def obter_segura(cidade: str) -> float | None:
-        try:
-            return get_temperature(cidade)
-        except Exception as e:
-            print(f"Erro ao obter temperatura de {cidade}: {e}")
-            return None
-
-    df["temperatura_c"] = df["city"].apply(obter_segura)
-    return df
+    return enrich_temperatures(df, column="city", target="temperatura_c", lookup=tabela)
 
 
 def plot_correlacao_temperatura_aluguel(
-    df: pd.DataFrame, salvar_arquivo: str | None = None
+    df: pd.DataFrame,
+    salvar_arquivo: str | None = None,
+    modo: str = "auto",
+    coluna_estrato: Optional[str] = None,
 ) -> None:
     """
     Gera um gráfico de dispersão entre temperatura e tempo médio de aluguel,
     incluindo linha de tendência (regressão linear) e valor da correlação.
     Pode salvar o gráfico como imagem PNG ou exibi-lo.
 
+    Com muitos pontos (modo 'densidade', escolhido automaticamente acima de
+    CORRELATION_SCATTER_MAX_POINTS), o gráfico mostra a densidade dos pontos
+    em um histograma 2D, com a correlação e a reta calculadas em blocos
+    (ver plot_correlacao_em_blocos) e uma amostra estratificada por cima.
+
     Args:
         df (pd.DataFrame): DataFrame contendo as colunas 'temperatura_c' e 'tempo_medio_aluguel_dias'.
         salvar_arquivo (str | None): Caminho para salvar a imagem do gráfico. Se None, exibe o gráfico.
+        modo (str): 'auto', 'dispersao' ou 'densidade'.
+        coluna_estrato (str, opcional): Coluna dos estratos da amostra no modo
+            densidade (ex.: 'city'). Padrão: faixas de temperatura.
 
     Returns:
         None
     """
-    colunas_necessarias = {"temperatura_c", "tempo_medio_aluguel_dias"}
+    colunas_necessarias = set(COLUNAS_CORRELACAO)
     if not colunas_necessarias.issubset(df.columns):
         print(f"As colunas {colunas_necessarias} são obrigatórias no DataFrame.")
         return
 
-    df_limpo = df.dropna(subset=list(colunas_necessarias))
+    df_limpo = df.dropna(subset=COLUNAS_CORRELACAO)
+
+    if modo == "auto":
+        modo = "densidade" if len(df_limpo) > LIMITE_PONTOS_DISPERSAO else "dispersao"
+    if modo == "densidade":
+        if not salvar_arquivo:
+            print("O modo densidade exige um arquivo de saída (salvar_arquivo).")
+            return
+        if df_limpo.empty:
+            print("Sem dados para o gráfico de densidade.")
+            return
+        plot_correlacao_em_blocos(
+            iter_chunks(df_limpo),
+            salvar_arquivo,
+            (df_limpo["temperatura_c"].min(), df_limpo["temperatura_c"].max()),
+            (
+                df_limpo["tempo_medio_aluguel_dias"].min(),
+                df_limpo["tempo_medio_aluguel_dias"].max(),
+            ),
+            fracao_amostra=TAMANHO_AMOSTRA / len(df_limpo),
+            coluna_estrato=coluna_estrato,
+        )
+        return
+
+    # Mesmos dados e parâmetros: o gráfico existente continua válido
+    impressao = fingerprint(
+        df_limpo[["temperatura_c", "tempo_medio_aluguel_dias"]],
+        {"grafico": "regplot", "figsize": [10, 6]},
+    )
+    if salvar_arquivo and is_up_to_date(salvar_arquivo, impressao):
+        print(f"[ARTEFATO INALTERADO] Gráfico mantido em: {salvar_arquivo}")
+        return
+
+    corr, _ = pearsonr(df_limpo["temperatura_c"], df_limpo["tempo_medio_aluguel_dias"])
+    titulo = f"{TITULO_GRAFICO} (r = {corr:.2f})"
+
+    if salvar_arquivo:
+        # Figure própria (sem o estado global do pyplot): seguro fora da
+        # thread principal
+        render_regression(
+            salvar_arquivo,
+            df_limpo["temperatura_c"].tolist(),
+            df_limpo["tempo_medio_aluguel_dias"].tolist(),
+            titulo,
+            EIXO_X,
+            EIXO_Y,
+        )
+        record_artifact(salvar_arquivo, impressao)
+        print(f"Gráfico salvo em: {salvar_arquivo}")
+        return
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     plt.figure(figsize=(10, 6))
     sns.regplot(
@@ -80,28 +151,160 @@ def plot_correlacao_temperatura_aluguel(
         line_kws={"color": "red"},
         ci=None,
     )
-
-    corr, _ = pearsonr(df_limpo["temperatura_c"], df_limpo["tempo_medio_aluguel_dias"])
-    plt.title(f"Correlação entre Temperatura e Tempo Médio de Aluguel (r = {corr:.2f})")
-    plt.xlabel("Temperatura Atual (°C)")
-    plt.ylabel("Tempo Médio de Aluguel (dias)")
+    plt.title(titulo)
+    plt.xlabel(EIXO_X)
+    plt.ylabel(EIXO_Y)
     plt.grid(True)
     plt.tight_layout()
-
-    if salvar_arquivo:
-        output_dir = os.path.dirname(salvar_arquivo)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-        plt.savefig(salvar_arquivo)
+    try:
+        plt.show()
+    except Exception as e:
+        print(f"Erro ao exibir gráfico: {e}")
+    finally:
         plt.close()
-        print(f"Gráfico salvo em: {salvar_arquivo}")
-    else:
-        try:
-            plt.show()
-        except Exception as e:
-            print(f"Erro ao exibir gráfico: {e}")
-        finally:
-            plt.close()
+
+
+def plot_correlacao_em_blocos(
+    blocos: Iterable[pd.DataFrame],
+    salvar_arquivo: str,
+    limites_x: Tuple[float, float],
+    limites_y: Tuple[float, float],
+    fracao_amostra: float = 0.001,
+    coluna_estrato: Optional[str] = None,
+) -> RunningRegression:
+    """
+    Gera o gráfico de densidade (histograma 2D) entre temperatura e tempo
+    médio de aluguel a partir de blocos de dados (ex.: iter_chunks). Apenas
+    um bloco é processado por vez: a correlação e a reta vêm de somas acumuladas
+    (stats.RunningRegression), a densidade de um histograma 2D com limites
+    fixos e, de cada bloco, é guardada só uma amostra estratificada para os
+    pontos sobrepostos.
+
+    Args:
+        blocos (Iterable[pd.DataFrame]): Blocos com as colunas 'temperatura_c'
+            e 'tempo_medio_aluguel_dias'.
+        salvar_arquivo (str): Caminho da imagem.
+        limites_x (Tuple[float, float]): Faixa de temperatura do gráfico.
+        limites_y (Tuple[float, float]): Faixa de tempo médio do gráfico.
+        fracao_amostra (float): Fração de cada bloco sobreposta como pontos
+            (0 desativa a amostra).
+        coluna_estrato (str, opcional): Coluna dos estratos da amostra.
+            Padrão: faixas de temperatura.
+
+    Returns:
+        RunningRegression: Correlação e regressão calculadas.
+    """
+    regressao = RunningRegression()
+    histograma = Histogram2D(limites_x, limites_y, FAIXAS_DENSIDADE)
+    amostras = []
+    for bloco in blocos:
+        bloco = bloco.dropna(subset=COLUNAS_CORRELACAO)
+        x = bloco["temperatura_c"].to_numpy(dtype=float)
+        y = bloco["tempo_medio_aluguel_dias"].to_numpy(dtype=float)
+        regressao.update(x, y)
+        histograma.update(x, y)
+        if fracao_amostra > 0 and len(bloco):
+            amostra = stratified_sample(
+                bloco,
+                math.ceil(len(bloco) * fracao_amostra),
+                coluna_estrato,
+                "temperatura_c",
+            )
+            amostras.append(amostra[COLUNAS_CORRELACAO])
+
+    if regressao.n < 2:
+        print("Pontos insuficientes para calcular a correlação.")
+        return regressao
+
+    amostra = pd.concat(amostras) if amostras else None
+    impressao = fingerprint(
+        pd.DataFrame(histograma.counts),
+        amostra,
+        [regressao.n, regressao.slope, regressao.intercept],
+        {"grafico": "densidade", "limites": [list(limites_x), list(limites_y)]},
+    )
+    if is_up_to_date(salvar_arquivo, impressao):
+        print(f"[ARTEFATO INALTERADO] Gráfico mantido em: {salvar_arquivo}")
+        return regressao
+
+    render_density(
+        salvar_arquivo,
+        histograma.counts,
+        histograma.x_edges,
+        histograma.y_edges,
+        f"{TITULO_GRAFICO} (r = {regressao.pearson:.2f}, n = {regressao.n:,})",
+        EIXO_X,
+        EIXO_Y,
+        slope=regressao.slope,
+        intercept=regressao.intercept,
+        sample_x=None if amostra is None else amostra["temperatura_c"].to_numpy(),
+        sample_y=(
+            None if amostra is None else amostra["tempo_medio_aluguel_dias"].to_numpy()
+        ),
+    )
+    record_artifact(salvar_arquivo, impressao)
+    print(f"Gráfico salvo em: {salvar_arquivo}")
+    return regressao
+
+
+def plot_correlacao_por_segmento(
+    df: pd.DataFrame, coluna_segmento: str, diretorio: str
+) -> List[str]:
+    """
+    Gera um gráfico de dispersão com linha de tendência para cada valor de
+    coluna_segmento (ex.: um por país ou por mês), desenhados em paralelo no
+    pool de processos de reports.charts. Segmentos cujos dados não mudaram
+    desde a última execução não são redesenhados.
+
+    Args:
+        df (pd.DataFrame): DataFrame com as colunas 'temperatura_c',
+            'tempo_medio_aluguel_dias' e coluna_segmento.
+        coluna_segmento (str): Coluna que define os segmentos.
+        diretorio (str): Diretório das imagens (uma por segmento).
+
+    Returns:
+        List[str]: Caminhos das imagens dos segmentos.
+    """
+    colunas = ["temperatura_c", "tempo_medio_aluguel_dias"]
+    df_limpo = df.dropna(subset=colunas + [coluna_segmento])
+
+    inalterados, jobs, impressoes = [], [], {}
+    for segmento, df_segmento in df_limpo.groupby(coluna_segmento, observed=True):
+        # Correlação e reta exigem ao menos dois pontos distintos
+        if df_segmento["temperatura_c"].nunique() < 2:
+            continue
+
+        nome_arquivo = f"{coluna_segmento}_{segmento}".replace(os.sep, "_")
+        caminho = os.path.join(diretorio, f"{nome_arquivo}.png")
+        impressao = fingerprint(df_segmento[colunas], {"grafico": "regplot"})
+        if is_up_to_date(caminho, impressao):
+            inalterados.append(caminho)
+            continue
+
+        corr, _ = pearsonr(df_segmento[colunas[0]], df_segmento[colunas[1]])
+        impressoes[caminho] = impressao
+        jobs.append(
+            ChartJob(
+                render_regression,
+                {
+                    "path": caminho,
+                    "x": df_segmento[colunas[0]].tolist(),
+                    "y": df_segmento[colunas[1]].tolist(),
+                    "title": f"{TITULO_GRAFICO} – {segmento} (r = {corr:.2f})",
+                    "xlabel": EIXO_X,
+                    "ylabel": EIXO_Y,
+                },
+            )
+        )
+
+    gerados = render_many(jobs)
+    for caminho in gerados:
+        record_artifact(caminho, impressoes[caminho])
+    print(
+        f"Gráficos por {coluna_segmento}: {len(gerados)} gerados, "
+        f"{len(inalterados)} inalterados, em {diretorio}"
+    )
+    return inalterados + gerados
 
 
 def main():
@@ -123,6 +326,10 @@ def main():
     plot_correlacao_temperatura_aluguel(df_com_temperatura, salvar_arquivo)
     print("**********************************************************")
 
+    print("4. Visualizar a mesma correlação separadamente para cada país:")
+    plot_correlacao_por_segmento(df_com_temperatura, "country", DIRETORIO_SEGMENTOS)
+    print("**********************************************************")
+
 
 if __name__ == "__main__":
     main()
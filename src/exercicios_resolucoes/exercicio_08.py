@@ -8,6 +8,7 @@
 
 import os
 import sys
+from typing import Optional
 
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
@@ -15,56 +16,36 @@ sys.path.insert(
 
 import pandas as pd
 
-from api.airvisual_api import get_aqi
-from api.weather_api import get_temperature
+from api.enrichment import EnrichmentLookup, enrich_environment
 from db.db_handler import run_query_from_file
+from reports.outputs import write_report_table
 
 QUERY_LIMIT = 10
 
 
 def calcula_tempo_medio_por_cidade() -> pd.DataFrame:
-    sql_path = "src/db/sql/ex_08_perfil_clientes.sql"
-    df_perfil_base = run_query_from_file(sql_path, QUERY_LIMIT)
+    query_name = "ex_08_perfil_clientes"
+    df_perfil_base = run_query_from_file(query_name, QUERY_LIMIT)
     return df_perfil_base
 
 
-def temperatura_cidade(df: pd.DataFrame) -> pd.DataFrame:
+def temperatura_e_aqi_cidades(
+    df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
     """
-    Adiciona a temperatura atual em Celsius a cada cidade do DataFrame.
+    Adiciona a temperatura atual em Celsius e o AQI de cada cidade, usando uma
+    única consulta à AirVisual por cidade (a WeatherAPI só é usada quando a
+    AirVisual não informa a temperatura).
 
     Args:
-        df (pd.DataFrame): DataFrame contendo uma coluna 'city'.
+        df (pd.DataFrame): DataFrame com as colunas 'cidade', 'estado' e 'pais'.
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada; apenas as cidades ausentes são consultadas na API.
 
     Returns:
-        pd.DataFrame: DataFrame com coluna 'temperatura_c' adicionada.
+        pd.DataFrame: DataFrame com as colunas 'temperatura_c' e 'aqi' adicionadas.
     """
-    df["temperatura_c"] = df["cidade"].apply(lambda cidade: get_temperature(cidade))
-    return df
-
-
-def obtem_aqi_cidades(cidades_df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Obtém o AQI das cidades e adiciona ao DataFrame original sem perder linhas.
-
-    Args:
-        cidades_df (pd.DataFrame): DataFrame com as cidades, estados e países.
-
-    Returns:
-        pd.DataFrame: Mesmo DataFrame com uma coluna extra "aqi".
-    """
-    aqi_list = []
-
-    for _, row in cidades_df.iterrows():
-        try:
-            aqi = get_aqi(row["cidade"], row["estado"], row["pais"])
-        except Exception:
-            aqi = None
-        aqi_list.append(aqi)
-
-    cidades_df = cidades_df.copy()
-    cidades_df["aqi"] = aqi_list
-
-    return cidades_df
+    return enrich_environment(df, "cidade", "estado", "pais", lookup=tabela)
 
 
 def analisa_perfil(df_perfil: pd.DataFrame) -> pd.DataFrame:
@@ -112,13 +93,8 @@ def main():
     print(df_perfil_base)
     print("**********************************************************")
 
-    print("Adicionando temperatura às cidades:")
-    df_perfil_temperatura = temperatura_cidade(df_perfil_base)
-    print(df_perfil_temperatura)
-    print("**********************************************************")
-
-    print("Obtendo AQI para as cidades:")
-    df_perfil_temperatura_aqi = obtem_aqi_cidades(df_perfil_temperatura)
+    print("Adicionando temperatura e AQI às cidades:")
+    df_perfil_temperatura_aqi = temperatura_e_aqi_cidades(df_perfil_base)
     print(df_perfil_temperatura_aqi)
     print("**********************************************************")
 
@@ -127,6 +103,11 @@ def main():
     print(df_perfil_final)
     print("**********************************************************")
 
+    print("Exportando perfil por faixa etária:")
+    for caminho in write_report_table("perfil_faixa_etaria", df_perfil_final).values():
+        print(f"  {caminho}")
+    print("**********************************************************")
+
 
 if __name__ == "__main__":
     main()
@@ -8,21 +8,37 @@
 
 import os
 import sys
+from typing import List, Optional
 
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
 
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 )
 
-from api.airvisual_api import get_aqi
-from api.weather_api import get_temperature
+from api.enrichment import EnrichmentLookup, enrich_environment
 from db.db_handler import run_query_from_file
-from exercicios_resolucoes.exercicio_04 import obtem_aqi_cidades
+from reports.artifacts import fingerprint, is_up_to_date, record_artifact
+from reports.excel import (
+    EXCEL_CHUNK_SIZE,
+    ColumnFormat,
+    SheetSpec,
+    StreamingExcelWriter,
+    iter_chunks,
+)
+from reports.outputs import get_report_formats, wants_format, write_report_table
 
 QUERY_LIMIT = 10
+RELATORIO_EXCEL = "data/reports/relatorio_clientes.xlsx"
+COLUNAS_TEMPERATURA = ["nome_completo", "cidade", "pais", "temperatura_c"]
+FORMATOS = {
+    "nome_completo": ColumnFormat(width=28),
+    "cidade": ColumnFormat(width=20),
+    "estado": ColumnFormat(width=20),
+    "pais": ColumnFormat(width=20),
+    "gasto_total": ColumnFormat("#,##0.00", 12),
+    "temperatura_c": ColumnFormat("0.0", 14),
+}
 
 
 def obtem_clientes() -> pd.DataFrame:
@@ -32,18 +48,18 @@ def obtem_clientes() -> pd.DataFrame:
     Returns:
         pd.DataFrame: Dados dos clientes com suas respectivas localizações.
     """
-    sql_path = "src/db/sql/ex_09_export_excel.sql"
-    return run_query_from_file(sql_path, QUERY_LIMIT)
-
+    query_name = "ex_09_export_excel"
+    return run_query_from_file(query_name, QUERY_LIMIT)
 
-def obtem_aqi(df):
-    df = obtem_aqi_cidades(df)
-    return df
 
-
-def obtem_temperatura(df):
-    df["temperatura_c"] = df["cidade"].apply(lambda cidade: get_temperature(cidade))
-    return df
+def obtem_temperatura_e_aqi(
+    df: pd.DataFrame, tabela: Optional[EnrichmentLookup] = None
+) -> pd.DataFrame:
+    """
+    Adiciona temperatura e AQI usando uma única consulta à AirVisual por cidade,
+    ou a tabela de enriquecimento compartilhada, se informada.
+    """
+    return enrich_environment(df, "cidade", "estado", "pais", lookup=tabela)
 
 
 def filtra_dados(df: pd.DataFrame) -> pd.DataFrame:
@@ -69,7 +85,10 @@ def filtra_dados(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def salva_em_excel(
-    df_completo: pd.DataFrame, df_filtrado: pd.DataFrame, caminho_arquivo: str
+    df_completo: pd.DataFrame,
+    df_filtrado: pd.DataFrame,
+    caminho_arquivo: str,
+    chunksize: int = EXCEL_CHUNK_SIZE,
 ) -> None:
     """
     Cria um arquivo Excel com múltiplas abas:
@@ -77,31 +96,69 @@ def salva_em_excel(
     - Temperaturas
     - Alertas (clientes filtrados)
 
+    As abas são gravadas em modo streaming (ver reports.excel), em blocos de
+    chunksize linhas; Clientes e Temperaturas saem de uma única passada sobre
+    os dados completos. Se os dados forem os mesmos da última geração (ver
+    reports.artifacts), o arquivo existente é mantido.
+
     Args:
         df_completo (pd.DataFrame): Dados originais dos clientes.
         df_filtrado (pd.DataFrame): Dados filtrados pelos critérios.
         caminho_arquivo (str): Caminho de saída do arquivo Excel.
+        chunksize (int): Linhas por bloco. Padrão é EXCEL_CHUNK_SIZE.
     """
-    wb = Workbook()
-
-    # Aba 1: Clientes
-    ws1 = wb.active
-    ws1.title = "Clientes"
-    for row in dataframe_to_rows(df_completo, index=False, header=True):
-        ws1.append(row)
-
-    # Aba 2: Temperaturas
-    ws2 = wb.create_sheet(title="Temperaturas")
-    colunas_temp = ["nome_completo", "cidade", "pais", "temperatura_c"]
-    for row in dataframe_to_rows(df_completo[colunas_temp], index=False, header=True):
-        ws2.append(row)
+    impressao = fingerprint(df_completo, df_filtrado, COLUNAS_TEMPERATURA, FORMATOS)
+    if is_up_to_date(caminho_arquivo, impressao):
+        print(f"[ARTEFATO INALTERADO] Relatório mantido em: {caminho_arquivo}")
+        return
+
+    with StreamingExcelWriter(caminho_arquivo) as writer:
+        writer.write(
+            iter_chunks(df_completo, chunksize),
+            [
+                SheetSpec("Clientes", formats=FORMATOS),
+                SheetSpec("Temperaturas", COLUNAS_TEMPERATURA, FORMATOS),
+            ],
+        )
+        writer.write(
+            iter_chunks(df_filtrado, chunksize),
+            [SheetSpec("Alertas", list(df_filtrado.columns), FORMATOS)],
+        )
+    record_artifact(caminho_arquivo, impressao)
+
+
+def exporta_relatorio(
+    df_completo: pd.DataFrame,
+    df_filtrado: pd.DataFrame,
+    caminho_excel: str = RELATORIO_EXCEL,
+) -> List[str]:
+    """
+    Exporta as tabelas Clientes, Temperaturas e Alertas nos formatos da
+    execução (ver reports.outputs), particionadas por país. O relatório Excel
+    com as três abas só é gerado quando o formato 'xlsx' é pedido.
 
-    # Aba 3: Alertas
-    ws3 = wb.create_sheet(title="Alertas")
-    for row in dataframe_to_rows(df_filtrado, index=False, header=True):
-        ws3.append(row)
+    Args:
+        df_completo (pd.DataFrame): Dados originais dos clientes.
+        df_filtrado (pd.DataFrame): Dados filtrados pelos critérios.
+        caminho_excel (str): Caminho de saída do arquivo Excel.
 
-    wb.save(caminho_arquivo)
+    Returns:
+        List[str]: Caminhos gerados.
+    """
+    formatos = [formato for formato in get_report_formats() if formato != "xlsx"]
+    tabelas = {
+        "clientes": df_completo,
+        "temperaturas": df_completo[COLUNAS_TEMPERATURA],
+        "alertas": df_filtrado,
+    }
+    caminhos = []
+    for nome, df in tabelas.items():
+        caminhos.extend(write_report_table(nome, df, ("pais",), formatos).values())
+
+    if wants_format("xlsx"):
+        salva_em_excel(df_completo, df_filtrado, caminho_excel)
+        caminhos.append(caminho_excel)
+    return caminhos
 
 
 def main():
@@ -112,20 +169,17 @@ def main():
     df = obtem_clientes()
     print(df.head())
 
-    print("🌡️ Buscando temperaturas...")
-    df = obtem_temperatura(df)
-    print(df.head())
-
-    print("🌫️ Buscando AQI...")
-    df = obtem_aqi(df)
+    print("🌡️🌫️ Buscando temperaturas e AQI...")
+    df = obtem_temperatura_e_aqi(df)
     print(df.head())
 
     print("✅ Filtrando dados...")
     df_filtrado = filtra_dados(df)
     print(df_filtrado.head())
 
-    print("💾 Salvando relatório em Excel...")
-    salva_em_excel(df, df_filtrado, "data/reports/relatorio_clientes.xlsx")
+    print("💾 Exportando relatório...")
+    for caminho in exporta_relatorio(df, df_filtrado):
+        print(f"  {caminho}")
 
     print("🎉 Relatório gerado com sucesso!")
 
@@ -5,7 +5,7 @@
 
 import os
 import sys
-from typing import Callable
+from typing import Callable, Optional
 
 import pandas as pd
 
@@ -15,16 +15,23 @@ sys.path.insert(
 
 from db.db_handler import run_query_from_file
 from api.airvisual_api import get_aqi  # Função que busca AQI real da API
-from cache.cache_handler import get_result, load_cache, save_cache
+from api.enrichment import EnrichmentLookup
+from cache.cache_handler import get_result, load_cache
 
 
-def exemplo_funcionamento_cache(df_tempo_medio_por_cidade: pd.DataFrame):
+def exemplo_funcionamento_cache(
+    df_tempo_medio_por_cidade: pd.DataFrame,
+    tabela: Optional[EnrichmentLookup] = None,
+):
     """
     Função para demonstrar funcionamento do cache inteligente usando CSV.
 
     Args:
         df_tempo_medio_por_cidade (pd.DataFrame): DataFrame com as cidades a consultar.
+        tabela (EnrichmentLookup, opcional): Tabela de enriquecimento
+            compartilhada, usada no lugar da API em caso de falta no CSV.
     """
+    buscar_aqi = tabela.aqi if tabela is not None else get_aqi
     CSV_PATH = "data/cache/aqi_cache_exemplo.csv"
     cache_data = load_cache(CSV_PATH)
 
@@ -33,18 +40,17 @@ def exemplo_funcionamento_cache(df_tempo_medio_por_cidade: pd.DataFrame):
         estado = row["district"]
         country = row["country"]
 
-        fetch_func: Callable[[], str] = lambda: get_aqi(cidade, estado, country)
+        fetch_func: Callable[[], str] = lambda: buscar_aqi(cidade, estado, country)
 
         resultado = get_result(cidade, cache_data, fetch_func=fetch_func)
-        save_cache(CSV_PATH, cache_data)
         print(f"Resultado para {cidade}: {resultado}")
 
 
 def main():
 
 
-    sql_path = "src/db/sql/ex_10_lista_cidades_cache_exemplo.sql"
-    df_tempo_medio_por_cidade = run_query_from_file(sql_path, 40)
+    query_name = "ex_10_lista_cidades_cache_exemplo"
+    df_tempo_medio_por_cidade = run_query_from_file(query_name, 40)
 
     exemplo_funcionamento_cache(df_tempo_medio_por_cidade)
 
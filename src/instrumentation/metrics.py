@@ -0,0 +1,382 @@
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+METRICS_DIR = os.getenv("METRICS_DIR", "data/reports")
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """
+    Histograma com baldes fixos (acumulados no formato do Prometheus), soma,
+    contagem, mínimo e máximo.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estima o quantil q pelo limite superior do balde que o contém (o
+        máximo observado para o último balde).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        accumulated = 0
+        for bound, count in zip(self.buckets, self.counts):
+            accumulated += count
+            if accumulated >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        accumulated, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            accumulated += count
+            result.append((repr(bound), accumulated))
+        result.append(("+Inf", self.count))
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas em memória, seguro entre threads: contadores e
+    histogramas identificados por nome e rótulos, exportáveis em JSON ou no
+    formato de texto do Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels: Any) -> None:
+        """
+        Incrementa um contador.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels: Any) -> None:
+        """
+        Registra uma observação em um histograma.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+            if help:
+                self._help.setdefault(name, help)
+
+    @contextmanager
+    def timer(self, name: str, help: str = "", **labels: Any) -> Iterator[None]:
+        """
+        Mede a duração do bloco em segundos no histograma informado.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, help, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas em um dicionário serializável, incluindo as taxas
+        de acerto de cada cache.
+        """
+        with self._lock:
+            counters = {
+                name: [
+                    {"labels": dict(key), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {"labels": dict(key), **histogram.summary()}
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+            lookups = dict(self._counters.get(CACHE_LOOKUPS, {}))
+
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "cache_ratios": _cache_ratios(lookups),
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Retorna as métricas no formato de exposição de texto do Prometheus.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    for bound, count in histogram.cumulative():
+                        bucket_key = key + (("le", bound),)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_key)} {count}"
+                        )
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in key
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _cache_ratios(lookups: Dict[Labels, float]) -> Dict[str, Dict[str, float]]:
+    totals: Dict[str, Dict[str, float]] = {}
+    for key, value in lookups.items():
+        labels = dict(key)
+        per_cache = totals.setdefault(labels.get("cache", ""), {})
+        result = labels.get("result", "")
+        per_cache[result] = per_cache.get(result, 0) + value
+
+    ratios = {}
+    for cache, results in totals.items():
+        total = sum(results.values())
+        ratios[cache] = {
+            "total": total,
+            **{
+                f"{result}_ratio": round(count / total, 4)
+                for result, count in results.items()
+            },
+        }
+    return ratios
+
+
+CACHE_LOOKUPS = "cache_lookups_total"
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Retorna o registro de métricas do processo.
+    """
+    return _registry
+
+
+def record_cache(cache: str, result: str) -> None:
+    """
+    Conta uma consulta a um cache. result: hit, negative, stale, expired ou miss.
+    """
+    _registry.inc(
+        CACHE_LOOKUPS,
+        help="Consultas a caches por resultado",
+        cache=cache,
+        result=result,
+    )
+
+
+def record_http_response(host: str, status: int, seconds: float, size: int) -> None:
+    """
+    Registra uma resposta HTTP: contagem por status, latência e bytes recebidos.
+    """
+    _registry.inc(
+        "http_requests_total", help="Requisições HTTP", host=host, status=status
+    )
+    _registry.observe(
+        "http_request_duration_seconds", seconds, help="Latência HTTP", host=host
+    )
+    _registry.inc("http_response_bytes_total", size, help="Bytes recebidos", host=host)
+
+
+def _record_call(operation: str, start: float, status: str) -> None:
+    _registry.observe(
+        "call_duration_seconds",
+        time.perf_counter() - start,
+        help="Latência por operação",
+        operation=operation,
+    )
+    _registry.inc(
+        "calls_total", help="Chamadas por operação", operation=operation, status=status
+    )
+
+
+def instrumented(operation: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorador que conta as chamadas e mede a latência da função (síncrona ou
+    assíncrona) em calls_total e call_duration_seconds, rotulados por
+    operation. O status é 'ok', 'vazio' (a função devolveu None, como fazem
+    os clientes de API em caso de falha) ou 'erro' (exceção).
+
+    Args:
+        operation (str): Nome da operação (ex.: 'weather.get_temperature').
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                status, start = "erro", time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                    status = "vazio" if result is None else "ok"
+                    return result
+                finally:
+                    _record_call(operation, start, status)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            status, start = "erro", time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                status = "vazio" if result is None else "ok"
+                return result
+            finally:
+                _record_call(operation, start, status)
+
+        return wrapper
+
+    return decorator
+
+
+def export_report(directory: str = METRICS_DIR) -> Tuple[str, str]:
+    """
+    Grava as métricas em metrics.json e metrics.prom no diretório informado.
+
+    Args:
+        directory (str): Diretório de saída.
+
+    Returns:
+        Tuple[str, str]: Caminhos dos arquivos JSON e Prometheus.
+    """
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, "metrics.json")
+    prom_path = os.path.join(directory, "metrics.prom")
+    with open(json_path, "w", encoding="utf-8") as file:
+        json.dump(_registry.to_dict(), file, ensure_ascii=False, indent=2)
+    with open(prom_path, "w", encoding="utf-8") as file:
+        file.write(_registry.to_prometheus())
+    return json_path, prom_path
+
+
+def format_summary() -> str:
+    """
+    Monta um resumo em texto das métricas: chamadas e latência por operação,
+    taxas de acerto dos caches e bytes recebidos por host.
+
+    Returns:
+        str: Resumo para impressão no terminal.
+    """
+    report = _registry.to_dict()
+    calls: Dict[str, Dict[str, float]] = {}
+    for item in report["counters"].get("calls_total", []):
+        per_status = calls.setdefault(item["labels"]["operation"], {})
+        per_status[item["labels"]["status"]] = item["value"]
+
+    lines = ["Chamadas (status) e latência p50/p95:"]
+    for item in sorted(
+        report["histograms"].get("call_duration_seconds", []),
+        key=lambda h: h["labels"]["operation"],
+    ):
+        operation = item["labels"]["operation"]
+        statuses = ", ".join(
+            f"{status}={count:g}" for status, count in sorted(calls[operation].items())
+        )
+        lines.append(
+            f"  {operation}: {item['count']} ({statuses}) "
+            f"p50={item['p50']:.3f}s p95={item['p95']:.3f}s"
+        )
+
+    lines.append("Caches:")
+    for cache, ratios in sorted(report["cache_ratios"].items()):
+        details = ", ".join(
+            f"{name[: -len('_ratio')]}={value:.0%}"
+            for name, value in sorted(ratios.items())
+            if name != "total"
+        )
+        lines.append(f"  {cache}: {ratios['total']:g} consultas ({details})")
+
+    lines.append("Bytes recebidos:")
+    for item in report["counters"].get("http_response_bytes_total", []):
+        lines.append(f"  {item['labels']['host']}: {item['value']:,.0f}")
+    return "\n".join(lines)
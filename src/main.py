@@ -1,4 +1,11 @@
 import importlib
+import sys
+
+from api.http_client import close_session
+from db.db_handler import dispose_engines
+from instrumentation.metrics import export_report, format_summary
+from reports.charts import shutdown_render_pool
+from reports.outputs import set_report_formats
 
 def run_all_exercises():
     for i in range(1, 11):
@@ -10,5 +17,38 @@ def run_all_exercises():
         else:
             print(f"⚠️ O módulo {module_name} não possui uma função main()")
 
+def run_pipeline():
+    # Importado aqui para que a execução sequencial não dependa do backend Agg
+    from pipeline.exercises import run_exercises_pipeline
+
+    falhas = run_exercises_pipeline()
+    if falhas:
+        print(f"⚠️ Etapas com erro ou ignoradas: {', '.join(sorted(falhas))}")
+
+def report_metrics():
+    json_path, prom_path = export_report()
+    print("\n**********************************************************")
+    print("Métricas da execução")
+    print("**********************************************************")
+    print(format_summary())
+    print(f"Relatórios: {json_path}, {prom_path}")
+
+def parse_report_formats(argv):
+    # --formatos=parquet,csv,xlsx escolhe as saídas desta execução
+    for arg in argv:
+        if arg.startswith("--formatos="):
+            return arg.split("=", 1)[1].split(",")
+    return None
+
 if __name__ == "__main__":
-    run_all_exercises()
+    set_report_formats(parse_report_formats(sys.argv))
+    try:
+        if "--sequencial" in sys.argv:
+            run_all_exercises()
+        else:
+            run_pipeline()
+    finally:
+        dispose_engines()
+        close_session()
+        shutdown_render_pool()
+        report_metrics()
@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "8"))
+
+STATUS_OK = "ok"
+STATUS_ERROR = "erro"
+STATUS_SKIPPED = "ignorado"
+
+
+@dataclass
+class Stage:
+    """
+    Etapa do pipeline: func recebe, na ordem de deps, os resultados das
+    etapas das quais depende. Etapas com o mesmo lock nunca rodam ao mesmo
+    tempo (ex.: código que usa o estado global do pyplot).
+    """
+
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    lock: Optional[threading.Lock] = None
+
+
+@dataclass
+class StageTiming:
+    """
+    Tempo de execução de uma etapa, em segundos desde o início do pipeline.
+    """
+
+    name: str
+    status: str
+    start: float = 0.0
+    end: float = 0.0
+    error: Optional[BaseException] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Dag:
+    """
+    Grafo acíclico de etapas executado por um pool de threads: cada etapa
+    começa assim que todas as suas dependências terminam, de modo que etapas
+    independentes rodam em paralelo e o tempo total se aproxima do caminho
+    mais longo do grafo, e não da soma das etapas.
+
+    O resultado de uma etapa pode ser usado por várias outras (entradas
+    compartilhadas). Se uma etapa falhar, as que dependem dela são ignoradas e
+    as demais continuam.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, StageTiming] = {}
+        self.wall_time = 0.0
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        deps: Tuple[str, ...] = (),
+        lock: Optional[threading.Lock] = None,
+    ) -> str:
+        """
+        Adiciona uma etapa ao grafo.
+
+        Args:
+            name (str): Nome único da etapa.
+            func (Callable[..., Any]): Função da etapa.
+            deps (Tuple[str, ...]): Etapas cujos resultados func recebe.
+            lock (threading.Lock, opcional): Lock mantido durante a execução.
+
+        Returns:
+            str: Nome da etapa, para uso em deps de outras etapas.
+        """
+        if name in self.stages:
+            raise ValueError(f"Etapa duplicada: {name}")
+        self.stages[name] = Stage(name, func, tuple(deps), lock)
+        return name
+
+    def _validate(self) -> None:
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(
+                        f"Etapa '{stage.name}' depende de '{dep}', inexistente"
+                    )
+
+        visiting, visited = set(), set()
+
+        def _visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo no pipeline envolvendo '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                _visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            _visit(name)
+
+    def run(self, max_workers: int = MAX_WORKERS) -> Dict[str, Any]:
+        """
+        Executa todas as etapas respeitando as dependências.
+
+        Args:
+            max_workers (int): Número máximo de etapas simultâneas.
+
+        Returns:
+            Dict[str, Any]: Resultado de cada etapa concluída com sucesso.
+        """
+        self._validate()
+        self.results, self.timings = {}, {}
+        pending = {name: set(stage.deps) for name, stage in self.stages.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for name, stage in self.stages.items():
+            for dep in stage.deps:
+                dependents[dep].append(name)
+
+        started_at = time.perf_counter()
+        running: Dict[Future, str] = {}
+
+        def _call(stage: Stage, args: List[Any]) -> StageTiming:
+            start = time.perf_counter() - started_at
+            try:
+                self.results[stage.name] = stage.func(*args)
+            except Exception as e:
+                end = time.perf_counter() - started_at
+                return StageTiming(stage.name, STATUS_ERROR, start, end, error=e)
+            return StageTiming(
+                stage.name, STATUS_OK, start, time.perf_counter() - started_at
+            )
+
+        def _run_stage(stage: Stage) -> StageTiming:
+            args = [self.results[dep] for dep in stage.deps]
+            if stage.lock is None:
+                return _call(stage, args)
+            with stage.lock:
+                return _call(stage, args)
+
+        def _skip(name: str) -> None:
+            for dependent in dependents[name]:
+                if dependent not in self.timings:
+                    self.timings[dependent] = StageTiming(dependent, STATUS_SKIPPED)
+                    pending.pop(dependent, None)
+                    _skip(dependent)
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="pipeline"
+        ) as executor:
+
+            def _submit_ready() -> None:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    running[executor.submit(_run_stage, self.stages[name])] = name
+
+            _submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    timing = future.result()
+                    self.timings[name] = timing
+                    if timing.status == STATUS_ERROR:
+                        print(f"[ERRO PIPELINE] Etapa '{name}' falhou: {timing.error}")
+                        _skip(name)
+                        continue
+
+                    for dependent in dependents[name]:
+                        if dependent in pending:
+                            pending[dependent].discard(name)
+                _submit_ready()
+
+        self.wall_time = time.perf_counter() - started_at
+        return self.results
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Retorna o caminho de maior duração acumulada no grafo, usando os
+        tempos da última execução.
+
+        Returns:
+            Tuple[List[str], float]: Etapas do caminho e sua duração total.
+        """
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def _longest(name: str) -> Tuple[float, List[str]]:
+            if name not in best:
+                timing = self.timings.get(name)
+                own = timing.duration if timing else 0.0
+                previous = max(
+                    (_longest(dep) for dep in self.stages[name].deps),
+                    key=lambda item: item[0],
+                    default=(0.0, []),
+                )
+                best[name] = (previous[0] + own, previous[1] + [name])
+            return best[name]
+
+        total, path = max(
+            (_longest(name) for name in self.stages),
+            key=lambda item: item[0],
+            default=(0.0, []),
+        )
+        return path, total
+
+    def report(self) -> str:
+        """
+        Monta o relatório de tempos por etapa da última execução.
+
+        Returns:
+            str: Tabela de texto com início, duração e status de cada etapa.
+        """
+        timings = sorted(
+            self.timings.values(),
+            key=lambda t: (t.status == STATUS_SKIPPED, t.start, t.name),
+        )
+        width = max((len(t.name) for t in timings), default=5)
+        lines = [f"{'etapa':<{width}}  {'início':>8}  {'duração':>8}  status"]
+        for timing in timings:
+            lines.append(
+                f"{timing.name:<{width}}  {timing.start:>7.2f}s  "
+                f"{timing.duration:>7.2f}s  {timing.status}"
+            )
+
+        path, path_time = self.critical_path()
+        total_stages = sum(t.duration for t in timings)
+        lines.append("")
+        lines.append(f"Tempo total: {self.wall_time:.2f}s")
+        lines.append(f"Soma das etapas: {total_stages:.2f}s")
+        lines.append(f"Caminho crítico ({path_time:.2f}s): {' -> '.join(path)}")
+        return "\n".join(lines)
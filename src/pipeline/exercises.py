@@ -0,0 +1,283 @@
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+import matplotlib
+
+# As etapas rodam fora da thread principal: usa um backend sem interface
+matplotlib.use("Agg")
+
+import pandas as pd
+
+from api.enrichment import EnrichmentLookup, build_enrichment_lookup
+from db.db_handler import run_query_from_file
+from exercicios_resolucoes import (
+    exercicio_01,
+    exercicio_02,
+    exercicio_03,
+    exercicio_04,
+    exercicio_05,
+    exercicio_06,
+    exercicio_07,
+    exercicio_08,
+    exercicio_09,
+    exercicio_10,
+)
+from pipeline.dag import MAX_WORKERS, STATUS_OK, Dag
+from reports.outputs import write_report_table
+
+SEPARADOR = "**********************************************************"
+GRAFICO_DISPERSAO = "data/pics/scatterplot_linha_tendencia.png"
+COLUNAS_LOCALIZACAO = ("cidade", "estado", "pais")
+
+_output_lock = threading.RLock()
+
+
+def _imprime(titulo: str, *blocos: Any) -> None:
+    """
+    Imprime o resultado de um exercício em bloco único, sem intercalar com a
+    saída de outras etapas.
+    """
+    with _output_lock:
+        print(f"\n{SEPARADOR}\n{titulo}\n{SEPARADOR}")
+        for bloco in blocos:
+            print(bloco)
+
+
+def enriquecimento_compartilhado(
+    fontes_cidades: Dict[str, str],
+    fontes_localizacoes: Dict[str, Tuple[str, str, str]],
+) -> Tuple[Callable[..., EnrichmentLookup], Tuple[str, ...]]:
+    """
+    Monta a etapa que reúne as cidades e localizações dos resultados de várias
+    consultas e resolve cada uma uma única vez (ver build_enrichment_lookup).
+
+    Args:
+        fontes_cidades (Dict[str, str]): Etapa -> coluna de cidade, para os
+            exercícios que só precisam de temperatura.
+        fontes_localizacoes (Dict[str, Tuple[str, str, str]]): Etapa ->
+            colunas (cidade, estado, país), para os que precisam da AirVisual.
+
+    Returns:
+        Tuple[Callable[..., EnrichmentLookup], Tuple[str, ...]]: Função da
+        etapa e suas dependências.
+    """
+    deps = tuple(fontes_cidades) + tuple(fontes_localizacoes)
+    colunas_cidade = list(fontes_cidades.values())
+    colunas_localizacao = list(fontes_localizacoes.values())
+
+    def _resolve(*dfs: pd.DataFrame) -> EnrichmentLookup:
+        dfs_cidades = dfs[: len(colunas_cidade)]
+        dfs_localizacoes = dfs[len(colunas_cidade) :]
+        cidades = itertools.chain.from_iterable(
+            df[coluna] for df, coluna in zip(dfs_cidades, colunas_cidade)
+        )
+        localizacoes = itertools.chain.from_iterable(
+            df[list(colunas)].itertuples(index=False, name=None)
+            for df, colunas in zip(dfs_localizacoes, colunas_localizacao)
+        )
+        return build_enrichment_lookup(localizacoes, cidades)
+
+    return _resolve, deps
+
+
+def _relatorio_01(df: pd.DataFrame) -> None:
+    media = exercicio_01.calcular_temperatura_media_ponderada(df)
+    with _output_lock:
+        _imprime(
+            "Exercício 01 – Temperatura média das cidades dos clientes",
+            df,
+            f"Temperatura média ponderada: {media:.2f} °C",
+        )
+        exercicio_01.gera_insights(df)
+
+
+def _relatorio_02(df: pd.DataFrame) -> None:
+    df_clima_ameno = exercicio_02.filtrar_cidades_clima_ameno(df)
+    receita = df_clima_ameno["receita_bruta"].sum()
+    _imprime(
+        "Exercício 02 – Receita de cidades com clima ameno",
+        df_clima_ameno,
+        f"💰 Receita total de cidades com clima ameno: R$ {receita:,.2f}",
+    )
+
+
+def _relatorio_03(df: pd.DataFrame) -> None:
+    df_alugueis = exercicio_03.calcula_alugueis_por_mil_habitantes(df)
+    with _output_lock:
+        _imprime("Exercício 03 – Países cinéfilos", df_alugueis)
+        exercicio_03.obtem_top_paises_cinefilos(df_alugueis, n=5)
+
+
+def _relatorio_05(df: pd.DataFrame) -> None:
+    df_criticos = exercicio_05.clientes_aqui_acima_de_130(df)
+    _imprime(
+        "Exercício 05 – Clientes em áreas críticas",
+        exercicio_05.classifica_clientes_por_aqui(df_criticos),
+    )
+
+
+def _grafico_06(df_continente: pd.DataFrame) -> None:
+    _imprime("Exercício 06 – Receita por continente", df_continente)
+    exercicio_06.salva_grafico_pizza(df_continente)
+
+
+def _grafico_07(df: pd.DataFrame) -> None:
+    _imprime("Exercício 07 – Temperatura x tempo médio de aluguel", df)
+    exercicio_07.plot_correlacao_temperatura_aluguel(df, GRAFICO_DISPERSAO)
+
+
+def _exportacao_09(df: pd.DataFrame) -> None:
+    df_filtrado = exercicio_09.filtra_dados(df)
+    caminhos = exercicio_09.exporta_relatorio(df, df_filtrado)
+    _imprime("Exercício 09 – Exportação", df_filtrado, *caminhos)
+
+
+def build_exercises_dag() -> Dag:
+    """
+    Declara as etapas (consulta, enriquecimento, agregação e exportação) dos
+    exercícios 01 a 10 e suas dependências.
+
+    Uma única etapa de enriquecimento reúne as cidades de todas as consultas
+    e resolve cada cidade/localização uma só vez; o resultado é a tabela
+    compartilhada usada pelas etapas de enriquecimento dos exercícios.
+
+    Returns:
+        Dag: Grafo pronto para execução.
+    """
+    dag = Dag()
+
+    q01 = dag.add("ex01.consulta", exercicio_01.cidades_clientes_mais_10_trasacoes)
+    q02 = dag.add("ex02.consulta", exercicio_02.receita_bruta_por_cidade)
+    q03 = dag.add("ex03.consulta", exercicio_03.paises_mais_alugueis)
+    q04 = dag.add("ex04.consulta", exercicio_04.cidades_mais_clientes)
+    q05 = dag.add("ex05.consulta", exercicio_05.clientes_em_areas_criticas)
+    q06 = dag.add("ex06.consulta", exercicio_06.mapeia_continente_pais)
+    q07 = dag.add("ex07.consulta", exercicio_07.calcula_tempo_medio_por_cidade)
+    q08 = dag.add("ex08.consulta", exercicio_08.calcula_tempo_medio_por_cidade)
+    q09 = dag.add("ex09.consulta", exercicio_09.obtem_clientes)
+    q10 = dag.add(
+        "ex10.consulta",
+        lambda: run_query_from_file("ex_10_lista_cidades_cache_exemplo", 40),
+    )
+
+    # O exercício 10 não entra na tabela: ele demonstra o cache em CSV, que
+    # deve ser consultado antes da API
+    resolve, deps = enriquecimento_compartilhado(
+        {q01: "city", q02: "city", q07: "city"},
+        {
+            q04: ("city", "district", "country"),
+            q05: COLUNAS_LOCALIZACAO,
+            q08: COLUNAS_LOCALIZACAO,
+            q09: COLUNAS_LOCALIZACAO,
+        },
+    )
+    tabela = dag.add("enriquecimento", resolve, deps=deps)
+
+    e01 = dag.add(
+        "ex01.enriquecimento", exercicio_01.temperatura_cidade, deps=(q01, tabela)
+    )
+    dag.add("ex01.relatorio", _relatorio_01, deps=(e01,))
+
+    e02 = dag.add(
+        "ex02.enriquecimento",
+        exercicio_02.temperatura_media_cidade,
+        deps=(q02, tabela),
+    )
+    dag.add("ex02.relatorio", _relatorio_02, deps=(e02,))
+
+    e03 = dag.add(
+        "ex03.enriquecimento", exercicio_03.obtem_populacao_por_pais, deps=(q03,)
+    )
+    dag.add("ex03.relatorio", _relatorio_03, deps=(e03,))
+
+    e04 = dag.add(
+        "ex04.enriquecimento", exercicio_04.obtem_aqi_cidades, deps=(q04, tabela)
+    )
+    f04 = dag.add(
+        "ex04.filmes",
+        lambda df: exercicio_04.filmes_mais_alugados_nas_cidades(
+            exercicio_04.filtra_cidades_alto_aqi(df)
+        ),
+        deps=(e04,),
+    )
+    dag.add(
+        "ex04.relatorio",
+        lambda df: _imprime("Exercício 04 – Filmes em cidades poluídas", df),
+        deps=(f04,),
+    )
+
+    e05 = dag.add(
+        "ex05.enriquecimento",
+        exercicio_05.combina_nomes_cidades_e_paises,
+        deps=(q05, tabela),
+    )
+    dag.add("ex05.relatorio", _relatorio_05, deps=(e05,))
+
+    a06 = dag.add(
+        "ex06.agregacao", exercicio_06.agrega_receita_por_continente, deps=(q06,)
+    )
+    dag.add("ex06.grafico", _grafico_06, deps=(a06,))
+    dag.add(
+        "ex06.exportacao",
+        lambda df: write_report_table("receita_continente", df),
+        deps=(a06,),
+    )
+
+    e07 = dag.add(
+        "ex07.enriquecimento",
+        exercicio_07.enriquecer_com_temperatura,
+        deps=(q07, tabela),
+    )
+    dag.add("ex07.grafico", _grafico_07, deps=(e07,))
+    dag.add(
+        "ex07.segmentos",
+        lambda df: exercicio_07.plot_correlacao_por_segmento(
+            df, "country", exercicio_07.DIRETORIO_SEGMENTOS
+        ),
+        deps=(e07,),
+    )
+
+    e08 = dag.add(
+        "ex08.enriquecimento",
+        exercicio_08.temperatura_e_aqi_cidades,
+        deps=(q08, tabela),
+    )
+    p08 = dag.add("ex08.perfil", exercicio_08.analisa_perfil, deps=(e08,))
+    dag.add(
+        "ex08.relatorio",
+        lambda df: _imprime("Exercício 08 – Perfil por faixa etária", df),
+        deps=(p08,),
+    )
+    dag.add(
+        "ex08.exportacao",
+        lambda df: write_report_table("perfil_faixa_etaria", df),
+        deps=(p08,),
+    )
+
+    e09 = dag.add(
+        "ex09.enriquecimento", exercicio_09.obtem_temperatura_e_aqi, deps=(q09, tabela)
+    )
+    dag.add("ex09.exportacao", _exportacao_09, deps=(e09,))
+
+    dag.add("ex10.cache", exercicio_10.exemplo_funcionamento_cache, deps=(q10, tabela))
+
+    return dag
+
+
+def run_exercises_pipeline(max_workers: int = MAX_WORKERS) -> List[str]:
+    """
+    Executa o pipeline dos exercícios e imprime os tempos de cada etapa.
+
+    Args:
+        max_workers (int): Número máximo de etapas simultâneas.
+
+    Returns:
+        List[str]: Etapas que falharam ou foram ignoradas.
+    """
+    dag = build_exercises_dag()
+    dag.run(max_workers)
+
+    print(f"\n{SEPARADOR}\nTempos por etapa\n{SEPARADOR}")
+    print(dag.report())
+    return [name for name, t in dag.timings.items() if t.status != STATUS_OK]
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+MANIFEST_PATH = os.getenv("ARTIFACT_MANIFEST", "data/reports/manifest.json")
+ARTIFACT_CACHE_ENABLED = os.getenv("ARTIFACT_CACHE_ENABLED", "1").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+
+_manifest_lock = threading.RLock()
+_manifests: Dict[str, Dict[str, dict]] = {}
+
+
+def _hash_dataframe(digest: Any, df: pd.DataFrame) -> None:
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Células não "hasheáveis" (listas, dicionários): usa a serialização
+        digest.update(df.to_json(orient="split", default_handler=str).encode())
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Calcula a impressão digital (SHA-256) do conteúdo das entradas de um
+    artefato: DataFrames pelo conteúdo, colunas e tipos; demais valores
+    (parâmetros, caminhos, versão do desenho) pela sua representação.
+
+    Args:
+        *parts (Any): DataFrames e parâmetros que determinam o artefato.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            _hash_dataframe(digest, part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=repr).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _output_size(path: str) -> Optional[int]:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(path)
+            for name in names
+        )
+    return None
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, dict]:
+    if manifest_path not in _manifests:
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                _manifests[manifest_path] = json.load(file)
+        except (OSError, ValueError):
+            _manifests[manifest_path] = {}
+    return _manifests[manifest_path]
+
+
+def _save_manifest(manifest_path: str, manifest: Dict[str, dict]) -> None:
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_up_to_date(
+    artifact: str,
+    artifact_fingerprint: str,
+    manifest_path: str = MANIFEST_PATH,
+) -> bool:
+    """
+    Indica se o artefato já foi gerado a partir das mesmas entradas: a
+    impressão digital registrada no manifesto é igual e todas as saídas
+    registradas existem com o mesmo tamanho.
+
+    Args:
+        artifact (str): Identificador do artefato (em geral, o caminho de saída).
+        artifact_fingerprint (str): Impressão digital atual das entradas.
+        manifest_path (str): Caminho do manifesto. Padrão é ARTIFACT_MANIFEST.
+
+    Returns:
+        bool: True se a geração pode ser pulada.
+    """
+    if not ARTIFACT_CACHE_ENABLED:
+        return False
+    with _manifest_lock:
+        entry = _load_manifest(manifest_path).get(artifact)
+    if not entry or entry.get("fingerprint") != artifact_fingerprint:
+        return False
+    return all(
+        _output_size(path) == output.get("bytes")
+        for path, output in entry.get("outputs", {}).items()
+    )
+
+
+def get_artifact_outputs(
+    artifact: str, manifest_path: str = MANIFEST_PATH
+) -> List[str]:
+    """
+    Retorna os caminhos registrados para o artefato no manifesto.
+    """
+    with _manifest_lock:
+        entry = _load_manifest(manifest_path).get(artifact) or {}
+    return list(entry.get("outputs", {}))
+
+
+def record_artifact(
+    artifact: str,
+    artifact_fingerprint: str,
+    outputs: Optional[Sequence[str]] = None,
+    manifest_path: str = MANIFEST_PATH,
+) -> None:
+    """
+    Registra no manifesto a impressão digital das entradas e o hash (SHA-256)
+    e o tamanho de cada saída gerada. Diretórios (datasets particionados)
+    guardam apenas o tamanho total.
+
+    Args:
+        artifact (str): Identificador do artefato.
+        artifact_fingerprint (str): Impressão digital das entradas.
+        outputs (Sequence[str], opcional): Caminhos gerados. Padrão é [artifact].
+        manifest_path (str): Caminho do manifesto. Padrão é ARTIFACT_MANIFEST.
+    """
+    entry_outputs = {}
+    for path in outputs if outputs is not None else [artifact]:
+        entry_outputs[path] = {
+            "sha256": _file_hash(path) if os.path.isfile(path) else None,
+            "bytes": _output_size(path),
+        }
+
+    with _manifest_lock:
+        manifest = _load_manifest(manifest_path)
+        manifest[artifact] = {
+            "fingerprint": artifact_fingerprint,
+            "outputs": entry_outputs,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        _save_manifest(manifest_path, manifest)
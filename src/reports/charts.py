@@ -0,0 +1,251 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import matplotlib
+import numpy as np
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", str(os.cpu_count() or 1)))
+CHART_DPI = 100
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _save(figure: Figure, path: str) -> str:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    figure.savefig(path, dpi=CHART_DPI)
+    return path
+
+
+def render_pie(
+    path: str,
+    values: Sequence[float],
+    labels: Sequence[str],
+    title: str,
+    figsize: Tuple[float, float] = (8, 8),
+) -> str:
+    """
+    Desenha um gráfico de pizza com percentuais e salva em PNG.
+
+    Args:
+        path (str): Caminho da imagem.
+        values (Sequence[float]): Valores de cada fatia.
+        labels (Sequence[str]): Rótulos das fatias.
+        title (str): Título do gráfico.
+        figsize (Tuple[float, float]): Tamanho da figura em polegadas.
+
+    Returns:
+        str: Caminho da imagem gerada.
+    """
+    figure = Figure(figsize=figsize)
+    axes = figure.add_subplot()
+    axes.pie(values, labels=labels, autopct="%1.1f%%", startangle=140)
+    axes.set_title(title)
+    figure.tight_layout()
+    return _save(figure, path)
+
+
+def render_regression(
+    path: str,
+    x: Sequence[float],
+    y: Sequence[float],
+    title: str,
+    xlabel: str,
+    ylabel: str,
+    figsize: Tuple[float, float] = (10, 6),
+) -> str:
+    """
+    Desenha um gráfico de dispersão com linha de tendência (regressão linear)
+    e salva em PNG.
+
+    Args:
+        path (str): Caminho da imagem.
+        x (Sequence[float]): Valores do eixo x.
+        y (Sequence[float]): Valores do eixo y.
+        title (str): Título do gráfico.
+        xlabel (str): Rótulo do eixo x.
+        ylabel (str): Rótulo do eixo y.
+        figsize (Tuple[float, float]): Tamanho da figura em polegadas.
+
+    Returns:
+        str: Caminho da imagem gerada.
+    """
+    import seaborn as sns
+
+    figure = Figure(figsize=figsize)
+    axes = figure.add_subplot()
+    sns.regplot(
+        x=np.asarray(x, dtype=float),
+        y=np.asarray(y, dtype=float),
+        ax=axes,
+        scatter_kws={"alpha": 0.6},
+        line_kws={"color": "red"},
+        ci=None,
+    )
+    axes.set_title(title)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    axes.grid(True)
+    figure.tight_layout()
+    return _save(figure, path)
+
+
+def render_density(
+    path: str,
+    counts: np.ndarray,
+    x_edges: Sequence[float],
+    y_edges: Sequence[float],
+    title: str,
+    xlabel: str,
+    ylabel: str,
+    slope: Optional[float] = None,
+    intercept: Optional[float] = None,
+    sample_x: Optional[Sequence[float]] = None,
+    sample_y: Optional[Sequence[float]] = None,
+    figsize: Tuple[float, float] = (10, 6),
+) -> str:
+    """
+    Desenha a densidade de pontos como histograma 2D (escala logarítmica),
+    com linha de tendência e, opcionalmente, uma amostra dos pontos por cima.
+    Recebe apenas as contagens já agregadas, de modo que o custo de desenho
+    não depende do número de pontos.
+
+    Args:
+        path (str): Caminho da imagem.
+        counts (np.ndarray): Contagens [bins_x, bins_y] (ver stats.Histogram2D).
+        x_edges (Sequence[float]): Limites das faixas de x.
+        y_edges (Sequence[float]): Limites das faixas de y.
+        title (str): Título do gráfico.
+        xlabel (str): Rótulo do eixo x.
+        ylabel (str): Rótulo do eixo y.
+        slope (float, opcional): Inclinação da linha de tendência.
+        intercept (float, opcional): Intercepto da linha de tendência.
+        sample_x (Sequence[float], opcional): x dos pontos amostrados.
+        sample_y (Sequence[float], opcional): y dos pontos amostrados.
+        figsize (Tuple[float, float]): Tamanho da figura em polegadas.
+
+    Returns:
+        str: Caminho da imagem gerada.
+    """
+    figure = Figure(figsize=figsize)
+    axes = figure.add_subplot()
+    counts = np.ma.masked_equal(np.asarray(counts), 0)
+    mesh = axes.pcolormesh(
+        x_edges, y_edges, counts.T, norm=LogNorm(vmin=1), cmap="viridis"
+    )
+    figure.colorbar(mesh, ax=axes, label="Pontos")
+
+    if sample_x is not None and sample_y is not None:
+        axes.scatter(sample_x, sample_y, s=4, alpha=0.4, color="white", linewidths=0)
+    if slope is not None and intercept is not None and np.isfinite(slope):
+        line_x = np.array([x_edges[0], x_edges[-1]])
+        axes.plot(line_x, intercept + slope * line_x, color="red")
+
+    axes.set_xlim(x_edges[0], x_edges[-1])
+    axes.set_ylim(y_edges[0], y_edges[-1])
+    axes.set_title(title)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    figure.tight_layout()
+    return _save(figure, path)
+
+
+@dataclass(frozen=True)
+class ChartJob:
+    """
+    Gráfico a ser desenhado: func é uma função de nível de módulo (como
+    render_pie), para que possa ser enviada a outro processo.
+    """
+
+    func: Callable[..., str]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+def _init_worker() -> None:
+    matplotlib.use("Agg")
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos de desenho compartilhado, criando-o na
+    primeira chamada com CHART_WORKERS processos. Os processos são iniciados
+    com spawn (o processo principal tem threads) e usam o backend Agg.
+
+    Returns:
+        ProcessPoolExecutor: Pool de processos.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=max(1, CHART_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+
+def shutdown_render_pool() -> None:
+    """
+    Encerra o pool de processos de desenho, se tiver sido criado.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+def _submit(jobs: List[ChartJob]) -> List[Future]:
+    try:
+        pool = get_render_pool()
+        return [pool.submit(job.func, **job.kwargs) for job in jobs]
+    except BrokenProcessPool:
+        # Um processo morreu em uma chamada anterior: recria o pool uma vez
+        shutdown_render_pool()
+        pool = get_render_pool()
+        return [pool.submit(job.func, **job.kwargs) for job in jobs]
+
+
+def render_many(jobs: Iterable[ChartJob]) -> List[str]:
+    """
+    Desenha vários gráficos em paralelo no pool de processos. Um único
+    gráfico é desenhado no próprio processo, sem o custo de iniciar o pool.
+    Cada gráfico usa sua própria Figure (API orientada a objetos), sem o
+    estado global do pyplot.
+
+    Args:
+        jobs (Iterable[ChartJob]): Gráficos a desenhar.
+
+    Returns:
+        List[str]: Caminhos das imagens geradas com sucesso, na ordem dos jobs.
+    """
+    jobs = list(jobs)
+    futures = _submit(jobs) if len(jobs) > 1 else None
+
+    paths, broken = [], False
+    for index, job in enumerate(jobs):
+        try:
+            if futures is None:
+                paths.append(job.func(**job.kwargs))
+            else:
+                paths.append(futures[index].result())
+        except BrokenProcessPool as e:
+            broken = True
+            print(f"[ERRO GRÁFICO] {job.kwargs.get('path')} - {e}")
+        except Exception as e:
+            print(f"[ERRO GRÁFICO] {job.kwargs.get('path')} - {e}")
+
+    if broken:
+        shutdown_render_pool()
+    return paths
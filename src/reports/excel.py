@@ -0,0 +1,207 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+EXCEL_CHUNK_SIZE = int(os.getenv("EXCEL_CHUNK_SIZE", "10000"))
+
+_HEADER_FONT = Font(bold=True)
+
+
+@dataclass(frozen=True)
+class ColumnFormat:
+    """
+    Formatação opcional de uma coluna: formato numérico do Excel (ex.: '0.0',
+    '#,##0.00') e largura.
+    """
+
+    number_format: Optional[str] = None
+    width: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class SheetSpec:
+    """
+    Aba a ser gravada: título, colunas (todas, se None) e formatação por coluna.
+    """
+
+    title: str
+    columns: Optional[Sequence[str]] = None
+    formats: Dict[str, ColumnFormat] = field(default_factory=dict)
+
+
+def iter_chunks(
+    df: pd.DataFrame, chunksize: int = EXCEL_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Divide um DataFrame em blocos de até chunksize linhas (visões, sem cópia).
+
+    Args:
+        df (pd.DataFrame): DataFrame de origem.
+        chunksize (int): Linhas por bloco. Padrão é EXCEL_CHUNK_SIZE.
+
+    Returns:
+        Iterator[pd.DataFrame]: Blocos do DataFrame.
+    """
+    if df.empty:
+        # Um bloco vazio, para que as abas ainda recebam o cabeçalho
+        yield df
+        return
+    for start in range(0, len(df), max(1, chunksize)):
+        yield df.iloc[start : start + chunksize]
+
+
+def _rows(chunk: pd.DataFrame) -> Iterator[Tuple[Any, ...]]:
+    # Tipos do numpy viram tipos nativos e valores ausentes viram células vazias
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+class _SheetWriter:
+    def __init__(self, worksheet: Any, spec: SheetSpec):
+        self.worksheet = worksheet
+        self.spec = spec
+        self.columns: Optional[List[str]] = (
+            list(spec.columns) if spec.columns is not None else None
+        )
+        self.rows = 0
+        self._started = False
+        self._formats: List[Tuple[int, str]] = []
+
+    def _start(self) -> None:
+        for position, column in enumerate(self.columns, start=1):
+            column_format = self.spec.formats.get(column)
+            if column_format is None:
+                continue
+            if column_format.width is not None:
+                letter = get_column_letter(position)
+                self.worksheet.column_dimensions[letter].width = column_format.width
+            if column_format.number_format:
+                self._formats.append((position - 1, column_format.number_format))
+
+        # No modo write-only, as configurações da aba são gravadas junto com a
+        # primeira linha: o congelamento precisa vir antes do cabeçalho
+        self.worksheet.freeze_panes = "A2"
+        header = []
+        for column in self.columns:
+            cell = WriteOnlyCell(self.worksheet, value=column)
+            cell.font = _HEADER_FONT
+            header.append(cell)
+        self.worksheet.append(header)
+        self._started = True
+
+    def append(self, chunk: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = [str(column) for column in chunk.columns]
+        if not self._started:
+            self._start()
+
+        selected = chunk if self.spec.columns is None else chunk[self.columns]
+        for row in _rows(selected):
+            if self._formats:
+                row = list(row)
+                for index, number_format in self._formats:
+                    cell = WriteOnlyCell(self.worksheet, value=row[index])
+                    cell.number_format = number_format
+                    row[index] = cell
+            self.worksheet.append(row)
+        self.rows += len(selected)
+
+    def finish(self) -> None:
+        # Fonte vazia: grava ao menos o cabeçalho, se as colunas forem conhecidas
+        if not self._started and self.columns is not None:
+            self._start()
+
+
+class StreamingExcelWriter:
+    """
+    Grava um arquivo Excel no modo write-only (streaming) do openpyxl: as
+    linhas vão direto para o arquivo à medida que os blocos de DataFrame
+    chegam, sem montar a planilha em memória, de modo que o consumo de
+    memória não depende do número de linhas.
+
+    Várias abas podem ser alimentadas por uma mesma fonte de blocos, que é
+    percorrida uma única vez. O arquivo é gravado em um temporário e só
+    substitui o destino ao final, sem deixar relatórios pela metade.
+
+        with StreamingExcelWriter("relatorio.xlsx") as writer:
+            writer.write(iter_chunks(df), [SheetSpec("Clientes")])
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: Dict[str, int] = {}
+        self._workbook = Workbook(write_only=True)
+
+    def __enter__(self) -> "StreamingExcelWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.save()
+
+    def write(
+        self, chunks: Iterable[pd.DataFrame], sheets: Sequence[SheetSpec]
+    ) -> None:
+        """
+        Cria as abas informadas e grava nelas os blocos de uma mesma fonte.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Blocos da fonte de dados, por
+                exemplo iter_chunks(df).
+            sheets (Sequence[SheetSpec]): Abas alimentadas por essa fonte.
+        """
+        writers = [
+            _SheetWriter(self._workbook.create_sheet(title=spec.title), spec)
+            for spec in sheets
+        ]
+        for chunk in chunks:
+            for writer in writers:
+                writer.append(chunk)
+        for writer in writers:
+            writer.finish()
+            self.rows[writer.spec.title] = writer.rows
+
+    def save(self) -> None:
+        """
+        Grava o arquivo no destino. Só pode ser chamado uma vez.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            self._workbook.save(tmp_path)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def write_excel(
+    path: str,
+    df: pd.DataFrame,
+    sheets: Optional[Sequence[SheetSpec]] = None,
+    chunksize: int = EXCEL_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """
+    Grava um DataFrame em um arquivo Excel no modo streaming.
+
+    Args:
+        path (str): Caminho do arquivo .xlsx.
+        df (pd.DataFrame): Dados a serem gravados.
+        sheets (Sequence[SheetSpec], opcional): Abas a partir desses dados.
+            Padrão é uma única aba 'Dados' com todas as colunas.
+        chunksize (int): Linhas por bloco. Padrão é EXCEL_CHUNK_SIZE.
+
+    Returns:
+        Dict[str, int]: Linhas gravadas em cada aba.
+    """
+    with StreamingExcelWriter(path) as writer:
+        writer.write(iter_chunks(df, chunksize), sheets or [SheetSpec("Dados")])
+    return writer.rows
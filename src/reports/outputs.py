@@ -0,0 +1,220 @@
+import os
+import shutil
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from reports.artifacts import (
+    fingerprint,
+    get_artifact_outputs,
+    is_up_to_date,
+    record_artifact,
+)
+from reports.excel import SheetSpec, write_excel
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", "data/reports")
+REPORT_FORMATS = os.getenv("REPORT_FORMATS", "parquet")
+
+# (nome da tabela, df, diretório do formato, colunas de partição) -> caminho
+Writer = Callable[[str, pd.DataFrame, str, Sequence[str]], str]
+
+_writers: Dict[str, Writer] = {}
+_formats_lock = threading.Lock()
+_formats: Optional[Tuple[str, ...]] = None
+
+
+def register_writer(name: str, writer: Writer) -> None:
+    """
+    Registra (ou substitui) um formato de saída.
+
+    Args:
+        name (str): Nome do formato, usado em REPORT_FORMATS (ex.: 'parquet').
+        writer (Writer): Função que grava a tabela e devolve o caminho gerado.
+    """
+    _writers[name] = writer
+
+
+def available_formats() -> List[str]:
+    return sorted(_writers)
+
+
+def parse_formats(value: str) -> Tuple[str, ...]:
+    """
+    Converte uma lista separada por vírgulas (ex.: 'parquet,xlsx') nos formatos
+    correspondentes, validando cada um.
+
+    Args:
+        value (str): Formatos separados por vírgula.
+
+    Returns:
+        Tuple[str, ...]: Formatos, sem repetição e na ordem informada.
+    """
+    formats = tuple(
+        dict.fromkeys(f.strip().lower() for f in value.split(",") if f.strip())
+    )
+    unknown = [f for f in formats if f not in _writers]
+    if unknown:
+        raise ValueError(
+            f"Formato de relatório desconhecido: {', '.join(unknown)} "
+            f"(disponíveis: {', '.join(available_formats())})"
+        )
+    return formats
+
+
+def get_report_formats() -> Tuple[str, ...]:
+    """
+    Retorna os formatos de saída da execução atual (padrão: REPORT_FORMATS).
+    """
+    global _formats
+    if _formats is None:
+        with _formats_lock:
+            if _formats is None:
+                _formats = parse_formats(REPORT_FORMATS)
+    return _formats
+
+
+def set_report_formats(formats: Optional[Iterable[str]]) -> None:
+    """
+    Define os formatos de saída da execução (ex.: a partir da linha de
+    comando). None volta ao padrão de REPORT_FORMATS.
+
+    Args:
+        formats (Iterable[str] | None): Formatos de saída.
+    """
+    global _formats
+    with _formats_lock:
+        _formats = parse_formats(",".join(formats)) if formats is not None else None
+
+
+def wants_format(name: str) -> bool:
+    """
+    Indica se o formato foi pedido nesta execução, para saídas caras (como o
+    XLSX) que só devem ser geradas sob demanda.
+    """
+    return name in get_report_formats()
+
+
+def _replace_dir(tmp_path: str, path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+    os.replace(tmp_path, path)
+
+
+def _write_empty(schema: pa.Schema, path: str, file_format: str) -> None:
+    if file_format == "parquet":
+        pq.write_table(schema.empty_table(), path)
+    else:
+        with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, schema):
+            pass
+
+
+def _write_dataset(file_format: str, extension: str) -> Writer:
+    def _write(
+        name: str, df: pd.DataFrame, directory: str, partition_cols: Sequence[str]
+    ) -> str:
+        path = os.path.join(directory, name)
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if df.empty:
+            # write_dataset não cria arquivos sem linhas: grava um único
+            # arquivo só com o esquema, para a tabela vazia continuar legível
+            os.makedirs(tmp_path)
+            schema = pa.Table.from_pandas(df, preserve_index=False).schema
+            _write_empty(
+                schema, os.path.join(tmp_path, f"part-0.{extension}"), file_format
+            )
+        else:
+            ds.write_dataset(
+                pa.Table.from_pandas(df, preserve_index=False),
+                tmp_path,
+                format=file_format,
+                partitioning=list(partition_cols) or None,
+                partitioning_flavor="hive" if partition_cols else None,
+                basename_template=f"part-{{i}}.{extension}",
+            )
+        _replace_dir(tmp_path, path)
+        return path
+
+    return _write
+
+
+def _write_csv_gzip(
+    name: str, df: pd.DataFrame, directory: str, partition_cols: Sequence[str]
+) -> str:
+    path = os.path.join(directory, f"{name}.csv.gz")
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False, compression="gzip")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _write_xlsx(
+    name: str, df: pd.DataFrame, directory: str, partition_cols: Sequence[str]
+) -> str:
+    path = os.path.join(directory, f"{name}.xlsx")
+    write_excel(path, df, [SheetSpec(name)])
+    return path
+
+
+register_writer("parquet", _write_dataset("parquet", "parquet"))
+register_writer("arrow", _write_dataset("ipc", "arrow"))
+register_writer("csv", _write_csv_gzip)
+register_writer("xlsx", _write_xlsx)
+
+
+def write_report_table(
+    name: str,
+    df: pd.DataFrame,
+    partition_cols: Sequence[str] = (),
+    formats: Optional[Iterable[str]] = None,
+    directory: str = REPORTS_DIR,
+) -> Dict[str, str]:
+    """
+    Grava uma tabela de relatório em cada formato pedido, em
+    <directory>/<formato>/<nome>. Parquet e Arrow IPC geram um dataset
+    particionado por partition_cols (diretórios no estilo hive, ex.:
+    pais=Brazil/), legível com pd.read_parquet ou pyarrow.dataset; CSV é
+    gravado compactado com gzip; XLSX, em uma única aba.
+
+    Saídas já geradas a partir dos mesmos dados (mesma impressão digital no
+    manifesto de reports.artifacts) não são regravadas.
+
+    Args:
+        name (str): Nome da tabela (ex.: 'clientes').
+        df (pd.DataFrame): Dados da tabela.
+        partition_cols (Sequence[str]): Colunas de partição (Parquet/Arrow).
+        formats (Iterable[str], opcional): Formatos de saída. Padrão são os
+            formatos da execução (get_report_formats).
+        directory (str): Diretório base. Padrão é REPORTS_DIR.
+
+    Returns:
+        Dict[str, str]: Caminho gerado por formato.
+    """
+    if formats is None:
+        formats = get_report_formats()
+    else:
+        formats = parse_formats(",".join(formats))
+
+    paths = {}
+    for file_format in formats:
+        format_dir = os.path.join(directory, file_format)
+        artifact = os.path.join(format_dir, name)
+        impressao = fingerprint(df, file_format, list(partition_cols))
+        if is_up_to_date(artifact, impressao):
+            print(f"[ARTEFATO INALTERADO] {artifact} ({file_format})")
+            paths[file_format] = get_artifact_outputs(artifact)[0]
+            continue
+
+        os.makedirs(format_dir, exist_ok=True)
+        paths[file_format] = _writers[file_format](
+            name, df, format_dir, tuple(partition_cols)
+        )
+        record_artifact(artifact, impressao, [paths[file_format]])
+    return paths
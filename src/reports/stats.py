@@ -0,0 +1,175 @@
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class RunningRegression:
+    """
+    Correlação de Pearson e regressão linear simples calculadas de forma
+    incremental, bloco a bloco, sem guardar os pontos.
+
+    Cada bloco é resumido de forma vetorizada em contagem, médias e somas de
+    quadrados e produtos centrados (co-momentos), e os resumos são combinados
+    pelas fórmulas de Chan et al. Somas centradas evitam a perda de precisão
+    de Σx² - (Σx)²/n com milhões de pontos, e resumos de blocos diferentes
+    (ou de processos diferentes) podem ser unidos com merge.
+    """
+
+    n: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    m2_x: float = 0.0
+    m2_y: float = 0.0
+    c_xy: float = 0.0
+
+    def update(self, x: Sequence[float], y: Sequence[float]) -> "RunningRegression":
+        """
+        Acrescenta um bloco de pontos (pares com NaN são ignorados).
+
+        Args:
+            x (Sequence[float]): Valores de x do bloco.
+            y (Sequence[float]): Valores de y do bloco.
+
+        Returns:
+            RunningRegression: O próprio acumulador.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        if not len(x):
+            return self
+
+        mean_x, mean_y = x.mean(), y.mean()
+        dx, dy = x - mean_x, y - mean_y
+        return self.merge(
+            RunningRegression(
+                n=len(x),
+                mean_x=float(mean_x),
+                mean_y=float(mean_y),
+                m2_x=float(dx @ dx),
+                m2_y=float(dy @ dy),
+                c_xy=float(dx @ dy),
+            )
+        )
+
+    def merge(self, other: "RunningRegression") -> "RunningRegression":
+        """
+        Une ao acumulador o resumo de outro conjunto de pontos.
+        """
+        if not other.n:
+            return self
+        if not self.n:
+            self.n, self.mean_x, self.mean_y = other.n, other.mean_x, other.mean_y
+            self.m2_x, self.m2_y, self.c_xy = other.m2_x, other.m2_y, other.c_xy
+            return self
+
+        n = self.n + other.n
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.mean_x += delta_x * other.n / n
+        self.mean_y += delta_y * other.n / n
+        self.m2_x += other.m2_x + delta_x * delta_x * weight
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.n = n
+        return self
+
+    @property
+    def pearson(self) -> float:
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        return self.c_xy / denominator if denominator else float("nan")
+
+    @property
+    def slope(self) -> float:
+        return self.c_xy / self.m2_x if self.m2_x else float("nan")
+
+    @property
+    def intercept(self) -> float:
+        return self.mean_y - self.slope * self.mean_x
+
+
+def _widen(limits: Tuple[float, float]) -> Tuple[float, float]:
+    # Faixa degenerada (todos os valores iguais): abre meia unidade de cada lado
+    low, high = float(limits[0]), float(limits[1])
+    return (low - 0.5, high + 0.5) if low >= high else (low, high)
+
+
+class Histogram2D:
+    """
+    Histograma 2D com limites fixos, acumulado bloco a bloco. Pontos fora dos
+    limites são contados na borda mais próxima.
+    """
+
+    def __init__(
+        self,
+        x_range: Tuple[float, float],
+        y_range: Tuple[float, float],
+        bins: int = 60,
+    ):
+        self.x_edges = np.linspace(*_widen(x_range), bins + 1)
+        self.y_edges = np.linspace(*_widen(y_range), bins + 1)
+        self.counts = np.zeros((bins, bins), dtype=np.int64)
+
+    def update(self, x: Sequence[float], y: Sequence[float]) -> "Histogram2D":
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x = np.clip(x[valid], self.x_edges[0], self.x_edges[-1])
+        y = np.clip(y[valid], self.y_edges[0], self.y_edges[-1])
+        counts, _, _ = np.histogram2d(x, y, bins=[self.x_edges, self.y_edges])
+        self.counts += counts.astype(np.int64)
+        return self
+
+
+def stratified_sample(
+    df: pd.DataFrame,
+    n: int,
+    strata: Optional[str] = None,
+    value_column: Optional[str] = None,
+    quantile_bins: int = 10,
+    random_state: int = 0,
+) -> pd.DataFrame:
+    """
+    Amostra até n linhas preservando a proporção de cada estrato, com ao
+    menos uma linha por estrato. Os estratos são os valores de strata ou, se
+    não informado, faixas de quantis de value_column (cobrindo toda a
+    distribuição, inclusive as caudas). Sem nenhum dos dois, a amostra é
+    aleatória simples.
+
+    Args:
+        df (pd.DataFrame): Dados de origem.
+        n (int): Tamanho aproximado da amostra.
+        strata (str, opcional): Coluna que define os estratos (ex.: 'city').
+        value_column (str, opcional): Coluna numérica usada para criar estratos
+            por quantis quando strata não é informado.
+        quantile_bins (int): Número de faixas de quantis.
+        random_state (int): Semente do sorteio.
+
+    Returns:
+        pd.DataFrame: Amostra.
+    """
+    if len(df) <= n:
+        return df
+    if strata is not None:
+        groups = df[strata]
+    elif value_column is not None:
+        groups = pd.qcut(
+            df[value_column], quantile_bins, labels=False, duplicates="drop"
+        )
+    else:
+        return df.sample(n, random_state=random_state)
+
+    # Ordem aleatória + posição dentro do estrato: fica com as primeiras
+    # "cota" linhas de cada estrato, sem apply por grupo
+    order = np.random.default_rng(random_state).permutation(len(df))
+    keys = pd.Series(np.asarray(groups)[order])
+    quota = np.maximum(1, np.ceil(keys.map(keys.value_counts()) * n / len(df)))
+    position = keys.groupby(keys, dropna=False).cumcount()
+    keep = order[(position < quota).to_numpy()]
+    return df.iloc[np.sort(keep)]
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from reports.excel import SheetSpec, write_excel
+
+
+def test_cabecalho_congelado(tmp_path):
+    caminho = str(tmp_path / "relatorio.xlsx")
+    df = pd.DataFrame({"nome_completo": ["Ana", "Bia"], "gasto_total": [1.5, 2.0]})
+
+    write_excel(caminho, df, [SheetSpec("Clientes")])
+
+    aba = load_workbook(caminho)["Clientes"]
+    assert aba.freeze_panes == "A2"
+    assert [celula.value for celula in aba[1]] == ["nome_completo", "gasto_total"]
+    assert aba.max_row == 3
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from reports import outputs
+
+
+def test_tabela_vazia_particionada_pode_ser_lida(tmp_path, monkeypatch):
+    monkeypatch.setattr(outputs, "is_up_to_date", lambda *args: False)
+    monkeypatch.setattr(outputs, "record_artifact", lambda *args: None)
+    vazio = pd.DataFrame(
+        {"nome_completo": pd.Series(dtype=str), "pais": pd.Series(dtype=str)}
+    )
+
+    caminhos = outputs.write_report_table(
+        "alertas", vazio, ("pais",), ["parquet", "arrow"], str(tmp_path)
+    )
+
+    lido = pd.read_parquet(caminhos["parquet"])
+    assert lido.empty
+    assert list(lido.columns) == ["nome_completo", "pais"]
+    tabela = outputs.ds.dataset(caminhos["arrow"], format="ipc").to_table()
+    assert tabela.num_rows == 0
+    assert tabela.column_names == ["nome_completo", "pais"]